@@ -0,0 +1,95 @@
+"""Render 5,000 linked answers into a chat Text widget with the shared 'link' tag, against the
+per-link tags and callbacks it replaced: render time, tag count and Tcl command count, plus the
+cost of resolving a clicked link. Needs a display for Tk."""
+
+import sys
+import time
+import tkinter as tk
+import types
+
+from common import best_of, report
+
+from desktop_pet import DesktopPet
+
+ANSWER = ("📚 Answer {i}: a short paragraph of text standing in for a summarized search result.\n"
+          "\n"
+          "🔗 Source: https://example.com/articles/{i}\n"
+          "🔗 Source: https://docs.example.org/page-{i}")
+
+
+def per_link_tags(pet, message):
+    """format_pet_message before the shared tag: a new tag and three callbacks per link"""
+    for i, line in enumerate(message.split('\n')):
+        line = line.strip()
+        if line.startswith('🔗 Source:'):
+            url = line.replace('🔗 Source:', '').strip()
+            pet.chat_display.insert(tk.END, "   🔗 Source: ", 'content')
+            start = pet.chat_display.index(tk.INSERT)
+            pet.chat_display.insert(tk.END, url)
+            end = pet.chat_display.index(tk.INSERT)
+            tag = f"clickable_link_{i}_{int(time.time() * 1000000)}"
+            pet.chat_display.tag_add(tag, start, end)
+            pet.chat_display.tag_config(tag, foreground='#00a8fc', underline=True)
+            pet.chat_display.tag_bind(tag, '<Button-1>', lambda event, u=url: pet.open_url_from_click(u))
+            pet.chat_display.tag_bind(tag, '<Enter>', lambda event: pet.chat_display.config(cursor='hand2'))
+            pet.chat_display.tag_bind(tag, '<Leave>', lambda event: pet.chat_display.config(cursor='arrow'))
+            pet.chat_display.insert(tk.END, "\n")
+        else:
+            pet.chat_display.insert(tk.END, line + "\n", 'content')
+
+
+def make_chat(root):
+    """A chat Text set up the way open_chat does, on a bare object standing in for DesktopPet"""
+    text = tk.Text(root)
+    pet = types.SimpleNamespace(chat_display=text, open_url_from_click=lambda url: None)
+    text.tag_config('content')
+    text.tag_config('pet')
+    text.tag_config('link', foreground='#00a8fc', underline=True)
+    text.tag_bind('link', '<Button-1>', types.MethodType(DesktopPet.on_chat_link_click, pet))
+    text.tag_bind('link', '<Enter>', lambda event: text.config(cursor='hand2'))
+    text.tag_bind('link', '<Leave>', lambda event: text.config(cursor='arrow'))
+    return pet
+
+
+def render(root, format_message, count):
+    pet = make_chat(root)
+    commands = len(root.tk.call('info', 'commands'))
+    started = time.perf_counter()
+    for i in range(count):
+        format_message(pet, ANSWER.format(i=i))
+        if i % 500 == 499:
+            root.update_idletasks()
+    elapsed = time.perf_counter() - started
+    added_commands = len(root.tk.call('info', 'commands')) - commands
+    return pet, elapsed, len(pet.chat_display.tag_names()), added_commands
+
+
+def main(count=5000):
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        sys.exit(f"bench_chat_links needs a display: {e}")
+    root.withdraw()
+    print(f"Chat links, {count} answers with two links each")
+    for label, format_message in (('per-link tags (before)', per_link_tags),
+                                  ('shared link tag', DesktopPet.format_pet_message)):
+        pet, elapsed, tags, commands = render(root, format_message, count)
+        report(f"{label}: render", elapsed)
+        print(f"  {'':<44} {tags} tags, {commands} new Tcl commands")
+        pet.chat_display.destroy()
+    
+    pet = make_chat(root)
+    for i in range(count):
+        DesktopPet.format_pet_message(pet, ANSWER.format(i=i))
+    text = pet.chat_display
+    last = text.tag_prevrange('link', tk.END)
+    
+    def resolve():
+        return text.get(*text.tag_prevrange('link', f'{last[0]} + 1c'))
+    assert resolve() == f'https://docs.example.org/page-{count - 1}'
+    report("resolve the last link (tag_prevrange)", best_of(resolve, number=1000), 'us')
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""ResultExtractor against the one-findall-per-pattern scrape it replaced, over saved results
+pages given as google:PATH or duckduckgo:PATH arguments. Without arguments, synthetic ~765 KB
+pages are generated: the results sit among several thousand unrelated elements, the way they do
+on a real results page. Both extractors must return the same snippets and links."""
+
+import re
+import sys
+
+from common import best_of, report
+
+from desktop_pet import DUCKDUCKGO_RESULT_PATTERNS, GOOGLE_RESULT_PATTERNS, DuckDuckGoProvider, GoogleProvider, ResultExtractor
+
+PROVIDERS = {'google': (GOOGLE_RESULT_PATTERNS, GoogleProvider),
+             'duckduckgo': (DUCKDUCKGO_RESULT_PATTERNS, DuckDuckGoProvider)}
+
+
+def findall_per_pattern(patterns, max_snippets, max_links, page):
+    """The scrape before ResultExtractor: one findall per pattern, then the caps"""
+    found = {'snippet': [], 'link': []}
+    for kind, pattern in patterns:
+        found[kind].extend(re.findall(pattern, page, re.DOTALL))
+    snippets = [ResultExtractor.clean(text) for text in found['snippet'][:max_snippets]]
+    links = [ResultExtractor.clean(text) for text in found['link'][:max_links]]
+    return [text for text in snippets if text], [text for text in links if text]
+
+
+def synthetic_pages():
+    filler = ''.join(f'<div class="pad{i}"><span>{"lorem ipsum &amp; dolor " * 8}</span>'
+                     f'<script>var x={i};</script></div>\n' for i in range(3000))
+    google = ''.join(f'<div class="g"><a href="/url?q=https://site{i}.example/p%3Fa%3D{i}&amp;sa=U"><h3>T{i}</h3></a>'
+                     f'<div class="VwiC3b yXK7lf">Result {i} &quot;snippet&quot; text that is rather long, with '
+                     f'&#8217;entities&#8217; and <em>markup</em> inside it.</div></div>\n' for i in range(12))
+    duckduckgo = ''.join(f'<div class="result__body"><div class="result__title"><a href="#">Title {i}</a></div>'
+                         f'<a class="result__url" href="#">duck{i}.example/page</a><a class="result__snippet" '
+                         f'href="#">Duck result {i} snippet &amp; text that is long enough to be chosen</a></div>\n'
+                         for i in range(12))
+    half = len(filler) // 2
+    return [('google', 'synthetic', f'<html><body>{filler[:half]}{google}{filler[half:]}</body></html>'),
+            ('duckduckgo', 'synthetic', f'<html><body>{duckduckgo}{filler}</body></html>')]
+
+
+def saved_pages(arguments):
+    pages = []
+    for argument in arguments:
+        kind, _, path = argument.partition(':')
+        if kind not in PROVIDERS or not path:
+            sys.exit(f"expected google:PATH or duckduckgo:PATH, got {argument!r}")
+        with open(path, encoding='utf-8', errors='replace') as f:
+            pages.append((kind, path, f.read()))
+    return pages
+
+
+def main(arguments):
+    for kind, name, page in saved_pages(arguments) if arguments else synthetic_pages():
+        patterns, provider = PROVIDERS[kind]
+        extractor = ResultExtractor(patterns, provider.max_snippets, provider.max_links)
+        expected = findall_per_pattern(patterns, provider.max_snippets, provider.max_links, page)
+        assert extractor.extract(page) == expected, f"{name}: extractors disagree"
+        print(f"{kind} {name} ({len(page) // 1024} KB, {len(expected[0])} snippets, {len(expected[1])} links)")
+        report("findall per pattern (before)",
+               best_of(lambda: findall_per_pattern(patterns, provider.max_snippets, provider.max_links, page), number=20))
+        report("ResultExtractor", best_of(lambda: extractor.extract(page), number=20))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,78 @@
+"""Sequential GETs against a local keep-alive http.server: a fresh connection per request
+(module-level requests.get, as before) against the pooled HttpClient. Pass --cert and --key
+(a self-signed pair, e.g. from openssl req -x509) to serve over TLS, where the saved
+handshake dominates."""
+
+import argparse
+import http.server
+import ssl
+import threading
+import time
+import warnings
+
+import requests
+import urllib3
+
+from common import report
+
+from desktop_pet import HttpClient
+
+BODY = b'x' * 2048
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True  # headers and body go out separately; don't stall on delayed ACKs
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+    
+    def log_message(self, *args):
+        pass
+
+
+def serve(cert=None, key=None):
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    scheme = 'http'
+    if cert:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = 'https'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'{scheme}://127.0.0.1:{server.server_address[1]}/'
+
+
+def per_request(get, url, count):
+    started = time.perf_counter()
+    for _ in range(count):
+        get(url, timeout=10, verify=False).content
+    return (time.perf_counter() - started) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--cert')
+    parser.add_argument('--key')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore', urllib3.exceptions.InsecureRequestWarning)
+    
+    server, url = serve(args.cert, args.key)
+    client = HttpClient()
+    try:
+        print(f"HTTP client, {args.requests} sequential GETs of {len(BODY)} bytes over {url.split(':')[0]}")
+        report("requests.get (new connection each)", per_request(requests.get, url, args.requests))
+        report("HttpClient (pooled keep-alive)", per_request(client.get, url, args.requests))
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""IntentRouter.match_phrase over thousands of chat messages, half canned phrases (in mixed case
+and punctuation) and half questions that fall through to search, against the if/elif chain of
+list literals process_message used before. Only matching is timed; respond() picks one reply."""
+
+import random
+
+from common import best_of
+
+from desktop_pet import BUILTIN_INTENTS, IntentRouter
+
+QUESTIONS = ['what is the capital of france', 'how tall is mount everest', 'who wrote hamlet',
+             'python list comprehension example', 'weather tomorrow in london', 'how do magnets work',
+             'best pizza near me', 'convert 10 miles to km', 'why is the sky blue', 'define entropy']
+
+
+def if_chain(msg):
+    """What process_message did before, returning the branch it took"""
+    msg_lower = msg.lower()
+    if msg_lower in ['joke', 'tell me a joke', 'tell a joke', 'make me laugh']:
+        return 'joke'
+    elif msg_lower in ['time', 'what time is it', 'whats the time', "what's the time", 'what time']:
+        return 'time'
+    elif msg_lower in ['date', 'what date is it', 'whats the date', "what's the date", 'what is the date', 'todays date',
+                       "today's date", 'what date', 'what is todays date', 'what is today', 'todays date']:
+        return 'date'
+    elif msg_lower in ['help', 'what can you do', 'commands']:
+        return 'help'
+    elif msg_lower in ['tip', 'give me a tip', 'productivity tip', 'advice']:
+        return 'tip'
+    elif msg_lower in ['fact', 'tell me a fact', 'fun fact', 'random fact']:
+        return 'fact'
+    elif any(msg_lower == greeting for greeting in ['hello', 'hi', 'hey', 'hi there', 'hey there', 'greetings']):
+        return 'greeting'
+    elif msg_lower in ['thanks', 'thank you', 'thx']:
+        return 'thanks'
+    elif msg_lower in ['how are you', 'how do you feel', 'how are you doing']:
+        return 'feeling'
+    elif msg_lower in ['who are you', 'what are you']:
+        return 'identity'
+    elif msg_lower in ['bye', 'goodbye', 'see you', 'see ya', 'later']:
+        return 'bye'
+    return None
+
+
+def make_messages(count, seed=1):
+    rng = random.Random(seed)
+    phrases = [phrase for intent in BUILTIN_INTENTS for phrase in intent.get('phrases', ())]
+    messages = []
+    for i in range(count):
+        if i % 2:
+            messages.append(rng.choice(QUESTIONS) + rng.choice(['', '?']))
+        else:
+            phrase = rng.choice(phrases)
+            messages.append(rng.choice([phrase, phrase.capitalize(), phrase.upper(), phrase + '!', phrase + '?']))
+    return messages
+
+
+def main(count=10000):
+    router = IntentRouter()
+    messages = make_messages(count)
+    hits = sum(1 for message in messages if router.match_phrase(message))
+    old_hits = sum(1 for message in messages if if_chain(message))
+    print(f"Intent matching, {count} messages ({hits} routed, {old_hits} by the old chain)")
+    for label, match in (("IntentRouter.match_phrase", router.match_phrase), ("if/elif chain", if_chain)):
+        seconds = best_of(lambda: [match(message) for message in messages])
+        print(f"  {label:<44} {seconds * 1e3:10.3f} ms  {count / seconds:12,.0f} msgs/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""NameIndex over 10k shortcut/URL entries: build, search, add and remove, against the
+linear scan of the entry list it replaced. The paged menus need a Tk display and are not
+covered here; with MENU_PAGE_SIZE rows per page, 10k entries render as 400 lazily filled pages."""
+
+import random
+import string
+
+from common import best_of, report
+
+from desktop_pet import NameIndex
+
+WORDS = ['code', 'studio', 'visual', 'chrome', 'notes', 'music', 'player', 'mail', 'slack', 'terminal',
+         'photo', 'editor', 'docs', 'drive', 'calendar', 'game', 'launcher', 'paint', 'zoom', 'office']
+
+
+def make_entries(count, seed=1):
+    rng = random.Random(seed)
+    entries = []
+    for i in range(count):
+        name = ' '.join(rng.sample(WORDS, rng.randint(1, 3))) + ' ' + ''.join(rng.choices(string.ascii_lowercase, k=4))
+        entries.append({'name': name, 'url': f'https://example.com/{i}'})
+    return entries
+
+
+def linear_search(entries, query):
+    """What the shortcut/URL dialogs did before: scan every entry"""
+    query = query.lower()
+    return [entry for entry in entries if query in entry['name'].lower()][:20]
+
+
+def main(count=10000):
+    entries = make_entries(count)
+    queries = ['co', 'visual st', 'chrme', 'zoom', 'terminal launcher', 'qqqq']
+    print(f"NameIndex, {count} entries")
+    report("build", best_of(lambda: NameIndex(entries), repeat=3))
+    index = NameIndex(entries)
+    for query in queries:
+        hits = len(index.search(query))
+        report(f"search {query!r} ({hits} hits)", best_of(lambda: index.search(query), number=200))
+        report(f"  linear scan {query!r}", best_of(lambda: linear_search(entries, query), number=20))
+    extra = make_entries(200, seed=2)
+    
+    def churn():
+        for entry in extra:
+            index.add(entry)
+        for entry in extra:
+            index.remove(entry)
+    report("add + remove (per entry)", best_of(churn, repeat=3) / len(extra))
+
+
+if __name__ == '__main__':
+    main()
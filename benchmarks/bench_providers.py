@@ -0,0 +1,94 @@
+"""Offline load test of the chat pipeline: questions go through process_message, the search
+cache and hedged_search to a FixtureProvider replaying canned answers with simulated latency,
+so no network is used. A provider that always raises is registered first (highest weight) to
+show it being put on cool-down after PROVIDER_FAILURE_LIMIT failures."""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from common import BarePet
+
+from desktop_pet import AsyncEngine, IntentRouter, QueryCache, SearchProvider, Summarizer
+
+ANSWER = ("The answer to this question is a paragraph of text long enough to be summarized. "
+          "It has a second sentence with more detail. And a third one that may be cut.\n"
+          "🔗 Source: https://example.com/answer")
+
+
+class FailingProvider(SearchProvider):
+    name = 'failing'
+    
+    def __init__(self):
+        super().__init__(timeout=1, weight=3.0)
+        self.calls = 0
+    
+    def search(self, query):
+        self.calls += 1
+        raise ConnectionError("unreachable")
+
+
+class NoRoot:
+    def after(self, ms, func, *args):
+        pass
+
+
+def make_pet(fixture_path, latency_ms):
+    warnings = []
+    pet = BarePet(root=NoRoot(), intent_router=IntentRouter(), search_cache=QueryCache(), answer_index=None,
+                  summarizer=Summarizer(), summary_relevance=True, engine=AsyncEngine(), http=None,
+                  search_hedge_ms=0, search_latency={}, search_latency_lock=threading.Lock(),
+                  search_fixture_only=True, search_fixture_file=fixture_path, search_fixture_latency_ms=latency_ms,
+                  search_fixture_record=False, search_provider_settings={},
+                  log_enabled=lambda category, level=0: False,
+                  log_to_console=lambda msg, *args, level=0, **kwargs: warnings.append(msg % args))
+    pet.setup_search_providers()
+    return pet, warnings
+
+
+async def ask_all(pet, questions):
+    async def ask(question):
+        started = time.perf_counter()
+        await pet.process_message(question)
+        return time.perf_counter() - started
+    return await asyncio.gather(*(ask(question) for question in questions))
+
+
+def run(pet, questions, label):
+    started = time.perf_counter()
+    latencies = sorted(pet.engine.submit(ask_all(pet, questions)).result())
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<28} {len(questions)} questions in {elapsed:.2f} s, "
+          f"p50 {statistics.median(latencies) * 1000:.0f} ms, p95 {latencies[int(len(latencies) * 0.95)] * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--questions', type=int, default=500)
+    parser.add_argument('--latency-ms', type=int, default=20)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        fixture_path = os.path.join(directory, 'fixture.json')
+        with open(fixture_path, 'w', encoding='utf-8') as f:
+            json.dump({'*': ANSWER}, f)
+        pet, warnings = make_pet(fixture_path, args.latency_ms)
+        failing = FailingProvider()
+        pet.search_providers.register(failing)
+        questions = [f"what is the answer to question number {i}" for i in range(args.questions)]
+        try:
+            print(f"Chat pipeline, fixture provider with {args.latency_ms} ms latency")
+            run(pet, questions, "cold (fixture searches)")
+            run(pet, questions, "warm (search cache hits)")
+            print(f"  failing provider called {failing.calls} times before its cool-down")
+        finally:
+            pet.engine.close()
+
+
+if __name__ == '__main__':
+    main()
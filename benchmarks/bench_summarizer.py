@@ -0,0 +1,69 @@
+"""Summarizer.summarize on generated snippet text from 1 KB to 1 MB, without a query (budget-limited
+scan) and with one (every sentence is scored), against the split('. ') loop summarize_content
+used before, which normalized the whole text first."""
+
+import random
+
+from common import best_of, report
+
+from desktop_pet import Summarizer
+
+WORDS = ['the', 'pet', 'search', 'answer', 'result', 'window', 'python', 'desktop', 'animation', 'cache',
+         'provider', 'question', 'frame', 'memory', 'network', 'index', 'summary', 'sentence', 'budget', 'query']
+
+
+def make_text(size, seed=1):
+    rng = random.Random(seed)
+    sentences = []
+    length = 0
+    while length < size:
+        sentence = ' '.join(rng.choices(WORDS, k=rng.randint(6, 20))).capitalize() + rng.choice(['.', '.', '!', '?'])
+        if rng.random() < 0.1:
+            sentence += '\n'
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return ' '.join(sentences)
+
+
+def summarize_content(content, max_chars=250):
+    """What the pet did before Summarizer"""
+    content = ' '.join(content.split())
+    
+    if len(content) <= max_chars:
+        return content
+    
+    sentences = content.split('. ')
+    summary = ""
+    
+    for sentence in sentences:
+        test_length = len(summary) + len(sentence) + 2
+        if test_length <= max_chars:
+            summary += sentence + ". "
+        else:
+            break
+    
+    if summary and len(summary) > 50:
+        return summary.strip()
+    
+    truncated = content[:max_chars]
+    last_space = truncated.rfind(' ')
+    if last_space > 0:
+        return truncated[:last_space] + "..."
+    
+    return truncated + "..."
+
+
+def main():
+    summarizer = Summarizer()
+    for size in (1000, 10000, 100000, 1000000):
+        text = make_text(size)
+        number = max(1, 200000 // size)
+        print(f"Summarize {len(text):,} chars to 250")
+        report("Summarizer, no query", best_of(lambda: summarizer.summarize(text), number=number))
+        report("Summarizer, query 'pet animation memory'",
+               best_of(lambda: summarizer.summarize(text, query='pet animation memory'), number=number))
+        report("old summarize_content", best_of(lambda: summarize_content(text), number=number))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Shared helpers for the benchmark scripts. Run a script from the repository root, e.g.
+python benchmarks/bench_name_index.py; each prints its own results and needs no extra packages."""
+
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from desktop_pet import DesktopPet  # noqa: E402
+
+
+def best_of(func, repeat=5, number=1):
+    """Best wall time of repeat runs of number calls to func, in seconds per call"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def report(label, seconds, unit='ms'):
+    scale = {'s': 1, 'ms': 1e3, 'us': 1e6}[unit]
+    print(f"  {label:<44} {seconds * scale:10.3f} {unit}")
+
+
+class BarePet:
+    """DesktopPet's methods on an object with no Tk window; the state they need is passed in"""
+    
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+    
+    def __getattr__(self, name):
+        return types.MethodType(getattr(DesktopPet, name), self)
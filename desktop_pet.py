@@ -27,8 +27,10 @@ if getattr(sys, 'frozen', False):
 
 import tkinter as tk
 from tkinter import Menu as TkMenu, simpledialog, messagebox, filedialog
-from PIL import Image, ImageTk
+from PIL import Image, ImageTk, ImageDraw, ImageChops
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from io import BytesIO
 import subprocess
 import platform
@@ -39,6 +41,1062 @@ import random
 import threading
 import urllib.parse
 import re
+import html
+import hashlib
+import sqlite3
+import time
+import mmap
+import bisect
+import itertools
+import logging
+import logging.handlers
+import functools
+import queue
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import abc
+
+DEFAULT_GIF_URL = "https://media.tenor.com/Ot-v5CHE2TUAAAAM/yoojung-gif-kim-yoo-jung.gif"
+FRAME_SCALE = 0.6
+FRAME_RESAMPLE = Image.Resampling.LANCZOS
+FRAME_CACHE_VERSION = 2
+FRAME_CACHE_MAX_ENTRIES = 8
+FRAME_WORKERS = 4
+DEFAULT_FRAME_DURATION = 100
+ANIM_STATS_INTERVAL = 10.0
+DRAG_FRAME_MS = 16
+STORE_DEBOUNCE_MS = 500
+MENU_PAGE_SIZE = 25
+SEARCH_RESULT_LIMIT = 20
+DELETE_DIALOG_LIMIT = 200
+CONSOLE_BUFFER_LINES = 2000
+CONSOLE_WIDGET_LINES = 1000
+CONSOLE_FLUSH_MS = 200
+CONSOLE_LOG_MAX_BYTES = 1 << 20
+CONSOLE_LOG_BACKUPS = 3
+LOG_DRAIN_MS = 250
+LOG_CATEGORIES = ('image', 'search', 'ui', 'storage')
+CHAT_WIDGET_MESSAGES = 200
+CHAT_PAGE_SIZE = 50
+CHAT_READ_BLOCK = 1 << 16
+SEARCH_CACHE_ENTRIES = 128
+SEARCH_CACHE_DISK_ENTRIES = 1000
+SEARCH_CACHE_DEFAULT_TTL = 6 * 3600
+# First matching keyword group picks the TTL (seconds) for a cached search result
+SEARCH_CACHE_TTLS = ((('weather', 'forecast', 'temperature'), 10 * 60),
+                     (('news', 'latest', 'today', 'score', 'price', 'stock'), 15 * 60),
+                     (('what is', 'what are', 'who was', 'define', 'meaning of', 'how to'), 7 * 86400))
+GOOGLE_SEARCH_URL = "https://www.google.com/search"
+DUCKDUCKGO_SEARCH_URL = "https://html.duckduckgo.com/html/"
+SEARCH_WORKERS = 4
+SEARCH_LATENCY_BUCKETS_MS = (250, 500, 1000, 2000, 5000)
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+SEARCH_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                     '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+PROVIDER_FAILURE_LIMIT = 3
+PROVIDER_COOLDOWN = 300
+ANSWER_INDEX_MAX_ROWS = 5000
+ANSWER_INDEX_MIN_SIMILARITY = 0.85
+# Filler is ignored when comparing questions. Stopwords (filler plus tense and auxiliary verbs) are
+# also left out of the full-text search, but 'who is' vs 'who was' still tells two questions apart.
+ANSWER_INDEX_FILLER = frozenset(('a', 'an', 'the', 's', 'of', 'to', 'in', 'on', 'for', 'me', 'please', 'you', 'tell'))
+ANSWER_INDEX_STOPWORDS = ANSWER_INDEX_FILLER | {'is', 'are', 'was', 'were', 'do', 'does', 'can'}
+ANSWER_INDEX_COMPACT_EVERY = 100
+SUMMARY_ABBREVIATIONS = frozenset(('mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'mt', 'vs', 'etc', 'e.g', 'i.e',
+                                   'inc', 'ltd', 'co', 'corp', 'no', 'vol', 'approx', 'est', 'dept', 'u.s', 'u.k',
+                                   'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec'))
+SUMMARY_RANK_SENTENCES = 64
+# (kind, pattern) pairs for ResultExtractor; each pattern has exactly one capture group.
+GOOGLE_RESULT_PATTERNS = (('snippet', r'<div class="[^"]*VwiC3b[^"]*"[^>]*>(.*?)</div>'),
+                          ('snippet', r'<span class="[^"]*aCOpRe[^"]*"[^>]*>(.*?)</span>'),
+                          ('snippet', r'<div[^>]*data-attrid="[^"]*"[^>]*>(.*?)</div>'),
+                          ('link', r'<a href="/url\?q=(https?://[^&"]+)'))
+DUCKDUCKGO_RESULT_PATTERNS = (('snippet', r'class="result__snippet"[^>]*>(.*?)</a>'),
+                              ('snippet', r'class="result__body"[^>]*>(.*?)</div>'),
+                              ('link', r'class="result__url"[^>]*>(.*?)</a>'))
+HTTP_POOL_HOSTS = 8
+HTTP_POOL_SIZE = 8
+HTTP_TIMEOUT = 10
+CHAT_WORKERS = 2
+CHAT_QUEUE_LIMIT = 4
+CHAT_ANSWER_DEADLINE = 20
+MENU_STYLE = dict(tearoff=0, bg='#3d3d5c', fg='#ffffff', activebackground='#4d4d6c',
+                  activeforeground='#ffffff', relief='solid', bd=1, font=('Segoe UI', 10))
+
+def scale_frame(frame, size):
+    return frame.convert('RGBA').resize(size, FRAME_RESAMPLE)
+
+def frame_delta_box(previous, frame):
+    """Bounding box of the pixels (colour or alpha) that differ between two RGBA frames"""
+    bands = ImageChops.difference(previous, frame).split()
+    changed = bands[0]
+    for band in bands[1:]:
+        changed = ImageChops.lighter(changed, band)
+    return changed.getbbox()
+
+class FrameProvider:
+    """Animation frames stored as a keyframe plus per-frame dirty-rectangle deltas.
+    show() paints deltas onto a single canvas PhotoImage, so each tick only touches the
+    changed region. Delta PhotoImages are built on demand and kept in an LRU window
+    bounded by a memory budget. close, if given, frees whatever the loader reads from and is
+    called by release()."""
+    
+    def __init__(self, loader, count, size, durations=None, keyframe=None,
+                 window=32, prefetch=4, budget_bytes=64 << 20, close=None):
+        self.loader = loader
+        self.close_source = close
+        self.keyframe = keyframe or (lambda: loader(0)[0])
+        self.count = count
+        self.size = size
+        if not durations or len(durations) != count:
+            durations = [DEFAULT_FRAME_DURATION] * count
+        # Browsers treat 0-10ms GIF delays as "unspecified" and fall back to 100ms
+        self.durations = [d if d and d > 10 else DEFAULT_FRAME_DURATION for d in durations]
+        self.canvas_bytes = size[0] * size[1] * 4
+        self.budget_bytes = max(budget_bytes - self.canvas_bytes, 0)
+        self.window = max(1, min(window, count))
+        self.prefetch_count = max(0, min(prefetch, self.window - 1))
+        self.ready = OrderedDict()
+        self.ready_bytes = 0
+        self.canvas = None
+        self.shown = None
+        self.current = None
+    
+    def __len__(self):
+        return self.count
+    
+    def show(self, index):
+        """Bring the canvas to frame index by applying every delta since the frame shown last"""
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        if self.canvas is None:
+            self.canvas = tk.PhotoImage(width=self.size[0], height=self.size[1])
+            keyframe = ImageTk.PhotoImage(self.keyframe())
+            self.paste(keyframe, (0, 0))
+            self.shown = 0
+        self.current = index
+        while self.shown != index:
+            self.shown = (self.shown + 1) % self.count
+            photo, position = self.get_delta(self.shown)
+            if photo is not None:
+                self.paste(photo, position)
+        self.evict()
+        return self.canvas
+    
+    def paste(self, photo, position):
+        self.canvas.tk.call(self.canvas.name, 'copy', str(photo), '-to', position[0], position[1],
+                            '-compositingrule', 'set')
+    
+    def get_delta(self, index):
+        entry = self.ready.get(index)
+        if entry is None:
+            entry = self.ready[index] = self.build_delta(index)
+            self.ready_bytes += entry[2]
+        self.ready.move_to_end(index)
+        return entry[0], entry[1]
+    
+    def build_delta(self, index):
+        image, position = self.loader(index)
+        if image is None:
+            return None, position, 0
+        return ImageTk.PhotoImage(image), position, image.size[0] * image.size[1] * 4
+    
+    def prefetch(self, start):
+        """Build the next few deltas from start so animate never waits on a decode"""
+        if self.loader is None:
+            return  # released while this call was queued
+        for offset in range(self.prefetch_count):
+            index = (start + offset) % self.count
+            if index not in self.ready:
+                entry = self.ready[index] = self.build_delta(index)
+                self.ready_bytes += entry[2]
+                self.evict()
+    
+    def evict(self):
+        """Drop least recently used deltas, never the current one or its prefetch look-ahead"""
+        while len(self.ready) > self.window or self.ready_bytes > self.budget_bytes:
+            for index in self.ready:
+                if self.current is None or (index - self.current) % self.count > self.prefetch_count:
+                    self.ready_bytes -= self.ready.pop(index)[2]
+                    break
+            else:
+                break
+    
+    def release(self):
+        """Drop the loader and built deltas, then close the frame source"""
+        self.loader = self.keyframe = None
+        self.ready.clear()
+        self.ready_bytes = 0
+        close, self.close_source = self.close_source, None
+        if close is not None:
+            close()
+    
+    @property
+    def memory_bytes(self):
+        return self.ready_bytes + (self.canvas_bytes if self.canvas is not None else 0)
+
+class JsonStore:
+    """One JSON document kept in memory and written back with an atomic write-rename.
+    Saves are coalesced over a short debounce window, so bulk edits cost one write."""
+    
+    def __init__(self, path, default, legacy_path=None, after=None, log=None):
+        self.path = path
+        self.after = after
+        self.log = log or (lambda msg, *args, **kwargs: print(msg % args))
+        self.dirty = False
+        self.job = None
+        self.data = self.read(path, default)
+        if self.data is None and legacy_path and os.path.exists(legacy_path):
+            self.data = self.read(legacy_path, default)
+            if self.data is not None:
+                self.dirty = True
+                self.flush()
+                self.retire_legacy(legacy_path)
+        if self.data is None:
+            self.data = default
+    
+    def retire_legacy(self, legacy_path):
+        """Rename the migrated legacy file, but only once its data is safely in the new store"""
+        if self.dirty:
+            self.log("Keeping %s until %s can be written", os.path.basename(legacy_path), self.path,
+                     level=logging.WARNING)
+            return
+        try:
+            os.replace(legacy_path, legacy_path + '.migrated')
+            self.log("Migrated %s to %s", os.path.basename(legacy_path), self.path)
+        except OSError as e:
+            self.log("Storage rename error (%s): %s", os.path.basename(legacy_path), e, level=logging.ERROR)
+    
+    @staticmethod
+    def read(path, default):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, type(default)) else None
+        except (OSError, ValueError):
+            return None
+    
+    def load(self):
+        return self.data
+    
+    def save(self, data=None):
+        if data is not None:
+            self.data = data
+        self.dirty = True
+        if self.after is None:
+            self.flush()
+        elif self.job is None:
+            self.job = self.after(STORE_DEBOUNCE_MS, self.flush)
+    
+    def flush(self):
+        self.job = None
+        if not self.dirty:
+            return
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            self.log("Storage write error (%s): %s", os.path.basename(self.path), e, level=logging.ERROR)
+
+class Storage:
+    """Persistent JSON state under one directory, with a single JsonStore per document"""
+    
+    def __init__(self, directory, after=None, log=None):
+        self.directory = directory
+        self.after = after
+        self.log = log
+        self.stores = {}
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+    
+    def open(self, name, default, legacy_path=None):
+        if name not in self.stores:
+            self.stores[name] = JsonStore(os.path.join(self.directory, name + '.json'), default,
+                                          legacy_path, self.after, self.log)
+        return self.stores[name]
+    
+    def flush(self):
+        for store in self.stores.values():
+            store.flush()
+
+class ChatTranscript:
+    """Chat history in an append-only JSONL file. Only the file size is kept in memory;
+    pages of older or newer messages are read back from a record's byte offset."""
+    
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'ab')
+        self.size = self.file.tell()
+        if self.size:
+            with open(path, 'rb') as f:
+                f.seek(self.size - 1)
+                if f.read(1) != b'\n':
+                    # Torn last record from a crash; start the next one on a fresh line
+                    self.file.write(b'\n')
+                    self.file.flush()
+                    self.size += 1
+    
+    def append(self, sender, message):
+        """Write one message and return its byte offset"""
+        offset = self.size
+        line = json.dumps({'time': time.time(), 'sender': sender, 'message': message}) + '\n'
+        data = line.encode('utf-8')
+        self.file.write(data)
+        self.file.flush()
+        self.size += len(data)
+        return offset
+    
+    @staticmethod
+    def parse(offset, line, found):
+        try:
+            found.append((offset, json.loads(line)))
+        except ValueError:
+            pass
+    
+    def read_before(self, offset, count):
+        """Return up to count (offset, record) pairs stored before offset, oldest first"""
+        found = []
+        with open(self.path, 'rb') as f:
+            start, buf = offset, b''
+            while len(found) < count and (buf or start > 0):
+                nl = buf.rfind(b'\n', 0, len(buf) - 1)
+                if nl == -1 and start > 0:
+                    read_from = max(0, start - CHAT_READ_BLOCK)
+                    f.seek(read_from)
+                    buf = f.read(start - read_from) + buf
+                    start = read_from
+                    continue
+                self.parse(start + nl + 1, buf[nl + 1:], found)
+                buf = buf[:nl + 1]
+        found.reverse()
+        return found
+    
+    def read_after(self, offset, count):
+        """Return up to count (offset, record) pairs stored after the record at offset"""
+        found = []
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            f.readline()
+            while len(found) < count:
+                position = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                self.parse(position, line, found)
+        return found
+    
+    def close(self):
+        self.file.close()
+
+class QueryCache:
+    """Search results keyed by normalized query, each kept for a TTL picked by the kind of
+    question. Recent results sit in an LRU dict; an optional JsonStore is the disk tier.
+    get/put run on search threads and read the store's in-memory copy under the lock; the
+    store is only written, and so the disk only touched, on the Tk thread through after()."""
+    
+    def __init__(self, capacity=SEARCH_CACHE_ENTRIES, store=None, after=None,
+                 disk_capacity=SEARCH_CACHE_DISK_ENTRIES):
+        self.capacity = capacity
+        self.store = store
+        self.after = after
+        self.disk_capacity = disk_capacity
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.pending = {}
+        self.hits = {'memory': 0, 'disk': 0}
+        self.misses = 0
+    
+    @staticmethod
+    def normalize(query):
+        return ' '.join(re.findall(r'\w+', query.lower()))
+    
+    @staticmethod
+    def ttl_for(key):
+        for words, ttl in SEARCH_CACHE_TTLS:
+            if any(word in key for word in words):
+                return ttl
+        return SEARCH_CACHE_DEFAULT_TTL
+    
+    def remember(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+    
+    def get(self, query):
+        """Return (result, tier) for a fresh cached result, or (None, None) on a miss"""
+        key = self.normalize(query)
+        now = time.time()
+        with self.lock:
+            tier = 'memory'
+            entry = self.entries.get(key)
+            if entry is None and self.store is not None:
+                tier = 'disk'
+                entry = self.pending.get(key) or self.store.load().get(key)
+            if entry and entry[0] > now:
+                self.remember(key, entry)
+                self.hits[tier] += 1
+                return entry[1], tier
+            self.entries.pop(key, None)
+            self.misses += 1
+        return None, None
+    
+    def put(self, query, result):
+        key = self.normalize(query)
+        entry = [time.time() + self.ttl_for(key), result]
+        with self.lock:
+            self.remember(key, entry)
+            if self.store is None:
+                return
+            self.pending[key] = entry
+        self.after(0, self.persist)
+    
+    def persist(self):
+        """Move pending results into the disk tier, dropping expired and soonest-to-expire ones"""
+        now = time.time()
+        with self.lock:
+            if not self.pending:
+                return
+            data = {key: entry for key, entry in self.store.load().items() if entry[0] > now}
+            data.update(self.pending)
+            self.pending.clear()
+            if len(data) > self.disk_capacity:
+                keep = sorted(data, key=lambda key: data[key][0])[-self.disk_capacity:]
+                data = {key: data[key] for key in keep}
+            self.store.save(data)
+    
+    def stats(self):
+        hits = self.hits['memory'] + self.hits['disk']
+        lookups = hits + self.misses
+        return (f"{hits} hits ({self.hits['memory']} memory, {self.hits['disk']} disk), "
+                f"{self.misses} misses, {hits * 100 // lookups if lookups else 0}% hit rate")
+
+class HttpClient:
+    """One pooled requests.Session shared by every outbound request, so repeat requests to a
+    host reuse a warm keep-alive connection. Idempotent requests are retried with backoff on
+    connection errors and 429/5xx replies, but never after a read timeout, so a host that
+    accepts and then stalls costs one timeout. Each host gets at most per_host requests at once.
+    Content encoding is whatever requests negotiates: gzip/deflate, plus br with brotli installed."""
+    
+    def __init__(self, retries=2, backoff=0.5, per_host=4):
+        self.per_host = per_host
+        self.lock = threading.Lock()
+        self.host_slots = {}
+        self.session = requests.Session()
+        retry = Retry(total=retries, read=0, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=('GET', 'HEAD'), respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def slot(self, url):
+        host = urllib.parse.urlsplit(url).netloc
+        with self.lock:
+            if host not in self.host_slots:
+                self.host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self.host_slots[host]
+    
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', HTTP_TIMEOUT)
+        with self.slot(url):
+            return self.session.get(url, **kwargs)
+    
+    def close(self):
+        self.session.close()
+
+class AsyncEngine:
+    """An asyncio loop on its own daemon thread. Tk code hands it coroutines with submit() and
+    gets concurrent futures back (cancelling one cancels the task); answers return to Tk through
+    root.after. Blocking scrapers run inside coroutines through run_blocking."""
+    
+    def __init__(self, workers=SEARCH_WORKERS):
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='search')
+        self.thread = threading.Thread(target=self.run, name='async-engine', daemon=True)
+        self.thread.start()
+    
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+    
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+    
+    def run_blocking(self, func, *args):
+        return self.loop.run_in_executor(self.executor, func, *args)
+    
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+class ResultExtractor:
+    """Walks a search results page once with a single precompiled pattern whose alternatives
+    are the provider's patterns, each inside a lookahead, so the scan stops wherever any of them
+    matches; the patterns after the one that won are then tried at that same position too. A
+    pattern's match that starts inside its own previous match is skipped, so every pattern
+    collects exactly what its own findall would. Results are ordered by pattern, then by page
+    position, capped per kind (None for no cap), stripped of markup and decoded with
+    html.unescape. The scan stops as soon as the later patterns can no longer change the result."""
+    
+    def __init__(self, patterns, max_snippets, max_links):
+        self.kinds = [kind for kind, pattern in patterns]
+        self.patterns = [re.compile(pattern, re.DOTALL) for kind, pattern in patterns]
+        # The patterns' shared literal start stays outside the lookaheads, so re can still skip
+        # ahead to it instead of trying every alternative at every position
+        sources = [pattern for kind, pattern in patterns]
+        prefix = os.path.commonprefix(sources)
+        prefix = prefix[:next((i for i, char in enumerate(prefix) if char in '\\.^$*+?{}[]|()'), len(prefix))]
+        self.pattern = re.compile(prefix + '(?:' + '|'.join(f'(?=({source[len(prefix):]}))' for source in sources)
+                                  + ')', re.DOTALL)
+        # Group number of each alternative's outer group; its pattern's capture follows it
+        self.outer = {}
+        group = 1
+        for index, pattern in enumerate(self.patterns):
+            self.outer[group] = index
+            group += 1 + pattern.groups
+        self.limits = {'snippet': max_snippets, 'link': max_links}
+    
+    @staticmethod
+    def clean(text):
+        return ' '.join(html.unescape(HTML_TAG_RE.sub('', text)).split())
+    
+    def extract(self, page):
+        """Return (snippets, links)"""
+        count = len(self.kinds)
+        caps = [self.limits[kind] for kind in self.kinds]
+        found = [[] for kind in self.kinds]
+        taken = [0] * count
+        resume = [0] * count
+        first = [self.kinds.index(kind) for kind in self.limits if kind in self.kinds]
+        for match in self.pattern.finditer(page):
+            start = match.start()
+            # The outer group closes last, so lastindex names the first alternative that matched
+            winner = self.outer[match.lastindex]
+            for index in range(winner, count):
+                if start < resume[index] or (caps[index] is not None and taken[index] >= caps[index]):
+                    continue
+                if index == winner:
+                    raw, end = match.group(match.lastindex + 1), match.end(match.lastindex)
+                else:
+                    other = self.patterns[index].match(page, start)
+                    if not other:
+                        continue
+                    raw, end = other.group(1), other.end()
+                taken[index] += 1
+                resume[index] = end
+                found[index].append(self.clean(raw))
+            if all(caps[i] is not None and taken[i] >= caps[i] for i in first):
+                break
+        snippets = [text for kind, texts in zip(self.kinds, found) if kind == 'snippet' for text in texts]
+        links = [text for kind, texts in zip(self.kinds, found) if kind == 'link' for text in texts]
+        # Matches that clean to nothing still count towards the caps, as in the old per-pattern lists
+        return ([text for text in snippets[:self.limits['snippet']] if text],
+                [text for text in links[:self.limits['link']] if text])
+
+class SearchProvider(abc.ABC):
+    """One source of search answers. search() returns the raw answer text (snippet followed by
+    '🔗 Source:' lines) or None, and may raise; the registry tracks how that went."""
+    
+    name = 'provider'
+    
+    def __init__(self, timeout=HTTP_TIMEOUT, weight=1.0, slow_after=None):
+        self.timeout = timeout
+        self.weight = weight
+        self.slow_after = slow_after if slow_after is not None else timeout * 0.8
+    
+    @abc.abstractmethod
+    def search(self, query):
+        """Return the answer text for query, or None"""
+
+class ScrapeProvider(SearchProvider):
+    """Scrapes a results page: GET url?q=query, then pick the longest snippet over 50 chars"""
+    
+    url = None
+    patterns = ()
+    max_snippets = 10
+    max_links = 3
+    
+    def __init__(self, http, **kwargs):
+        super().__init__(**kwargs)
+        self.http = http
+        self.extractor = ResultExtractor(self.patterns, self.max_snippets, self.max_links)
+    
+    def search(self, query):
+        search_url = f"{self.url}?q={urllib.parse.quote_plus(query)}"
+        # CRITICAL FIX FOR EXE: Always use verify=False
+        response = self.http.get(search_url, headers={'User-Agent': SEARCH_USER_AGENT},
+                                 timeout=self.timeout, verify=False)
+        snippets, links = self.extractor.extract(response.text)
+        best_result = max((text for text in snippets if len(text) > 50), key=len, default=None)
+        if not best_result:
+            return None
+        return "\n".join([best_result] + [f"🔗 Source: {url}" for url in self.source_urls(links)])
+    
+    def source_urls(self, links):
+        return links
+
+class GoogleProvider(ScrapeProvider):
+    name = 'google'
+    url = GOOGLE_SEARCH_URL
+    patterns = GOOGLE_RESULT_PATTERNS
+    max_snippets = 15
+    max_links = None
+    
+    def source_urls(self, links):
+        """First three result URLs on distinct domains"""
+        urls = []
+        seen_domains = set()
+        for url in links:
+            clean_url = urllib.parse.unquote(url)
+            domain_match = re.search(r'https?://([^/]+)', clean_url)
+            if domain_match and domain_match.group(1) not in seen_domains:
+                seen_domains.add(domain_match.group(1))
+                urls.append(clean_url)
+                if len(urls) >= 3:
+                    break
+        return urls
+
+class DuckDuckGoProvider(ScrapeProvider):
+    name = 'duckduckgo'
+    url = DUCKDUCKGO_SEARCH_URL
+    patterns = DUCKDUCKGO_RESULT_PATTERNS
+    
+    def source_urls(self, links):
+        return [url if url.startswith(('http://', 'https://')) else 'https://' + url for url in links]
+
+class FixtureProvider(SearchProvider):
+    """Offline answers replayed from a JSON file of {normalized query: answer text}, with an
+    optional '*' fallback and simulated latency, for load-testing the chat pipeline.
+    With record=True, answers from live providers are added to the file."""
+    
+    name = 'fixture'
+    
+    def __init__(self, path, latency_ms=0, record=False, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.latency_ms = latency_ms
+        self.record_answers = record
+        self.lock = threading.Lock()
+        self.store = JsonStore(path, {})
+        self.answers = self.store.load()
+    
+    def search(self, query):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return self.answers.get(QueryCache.normalize(query), self.answers.get('*'))
+    
+    def record(self, query, result):
+        if not self.record_answers:
+            return
+        with self.lock:
+            self.answers[QueryCache.normalize(query)] = result
+            self.store.save()
+
+class ProviderRegistry:
+    """Search providers by weight, with health tracking: PROVIDER_FAILURE_LIMIT failures or slow
+    answers in a row put a provider on cool-down for PROVIDER_COOLDOWN seconds."""
+    
+    def __init__(self):
+        self.providers = []
+        self.lock = threading.Lock()
+        self.health = {}
+    
+    def register(self, provider):
+        self.providers.append(provider)
+        self.providers.sort(key=lambda p: -p.weight)
+        self.health[provider.name] = {'failures': 0, 'cooldown_until': 0.0}
+    
+    def get(self, name):
+        return next((p for p in self.providers if p.name == name), None)
+    
+    def available(self):
+        """Providers not cooling down, best weight first; all of them if every one is"""
+        now = time.monotonic()
+        with self.lock:
+            ready = [p for p in self.providers if self.health[p.name]['cooldown_until'] <= now]
+        return ready or list(self.providers)
+    
+    def report(self, provider, ok, elapsed):
+        """Record one call; returns True when it just put the provider on cool-down"""
+        with self.lock:
+            health = self.health[provider.name]
+            if ok and elapsed <= provider.slow_after:
+                health['failures'] = 0
+                return False
+            health['failures'] += 1
+            if health['failures'] < PROVIDER_FAILURE_LIMIT:
+                return False
+            health['failures'] = 0
+            health['cooldown_until'] = time.monotonic() + PROVIDER_COOLDOWN
+            return True
+
+# Canned chat intents. phrases are whole messages answered without a web search; any other
+# message goes to the web. {time} and {date} in a response are filled in when it is sent.
+BUILTIN_INTENTS = [
+    {'name': 'help',
+     'phrases': ['help', 'what can you do', 'commands'],
+     'responses': ["I can help you with:\n"
+                   "• Search the web for ANY question\n"
+                   "• Tell you the time/date\n"
+                   "• Tell jokes and fun facts\n"
+                   "• Give productivity tips\n"
+                   "• Answer questions\n"
+                   "• Just chat!\n\n"
+                   "Just ask me anything naturally!"]},
+    {'name': 'time',
+     'phrases': ['time', 'what time is it', 'whats the time', "what's the time", 'what time'],
+     'responses': ["It's currently {time}! ⏰"]},
+    {'name': 'date',
+     'phrases': ['date', 'what date is it', 'whats the date', "what's the date", 'what is the date', 'todays date',
+                 "today's date", 'what date', 'what is todays date', 'what is today'],
+     'responses': ["Today is {date}! 📅"]},
+    {'name': 'joke',
+     'phrases': ['joke', 'tell me a joke', 'tell a joke', 'make me laugh'],
+     'responses': ["Why do programmers prefer dark mode? Because light attracts bugs! 🐛",
+                   "Why did the desktop pet cross the road? To get to the other taskbar! 🐾",
+                   "What's a computer's favorite snack? Microchips! 💾",
+                   "Why was the computer cold? It left its Windows open! 🪟",
+                   "How do you comfort a JavaScript bug? You console it! 😄",
+                   "Why do Java developers wear glasses? Because they can't C#! 👓",
+                   "What did the router say to the doctor? It hurts when IP! 🤕"]},
+    {'name': 'tip',
+     'phrases': ['tip', 'give me a tip', 'productivity tip', 'advice'],
+     'responses': ["Take regular breaks! Try the Pomodoro technique: 25 minutes of work, 5 minutes of rest. 🍅",
+                   "Stay hydrated! Your brain works better when you drink enough water. 💧",
+                   "Organize your tasks by priority. Do the most important things first! 📝",
+                   "A clean workspace leads to a clear mind. Take a minute to tidy up! 🧹",
+                   "Don't forget to stretch! Your body will thank you. 🧘",
+                   "Use keyboard shortcuts to save time and boost productivity! ⌨️",
+                   "Set specific goals for the day. Checking them off feels great! ✅"]},
+    {'name': 'fact',
+     'phrases': ['fact', 'tell me a fact', 'fun fact', 'random fact'],
+     'responses': ["The first computer mouse was made of wood! 🖱️",
+                   "The average person blinks 15-20 times per minute, but only 7 times while using a computer! 👀",
+                   "The QWERTY keyboard was designed to slow down typing to prevent typewriter jams! ⌨️",
+                   "Email existed before the World Wide Web! 📧",
+                   "The first 1GB hard drive weighed over 500 pounds! 💾",
+                   "There are more possible games of chess than atoms in the observable universe! ♟️",
+                   "The first computer bug was an actual bug - a moth trapped in a computer! 🦋"]},
+    {'name': 'thanks',
+     'phrases': ['thanks', 'thank you', 'thx'],
+     'responses': ["You're very welcome! Happy to help! 😊"]},
+    {'name': 'how_are_you',
+     'phrases': ['how are you', 'how do you feel', 'how are you doing'],
+     'responses': ["I'm doing great! Thanks for asking. Ready to assist you anytime! 🐾"]},
+    {'name': 'who_are_you',
+     'phrases': ['who are you', 'what are you'],
+     'responses': ["I'm your Desktop Pet AI Assistant! I'm here to keep you company, help you stay productive, "
+                   "and answer your questions. I can search the web for you! 🤖"]},
+    {'name': 'bye',
+     'phrases': ['bye', 'goodbye', 'see you', 'see ya', 'later'],
+     'responses': ["Goodbye! I'll be here whenever you need me. Take care! 👋"]},
+    {'name': 'greeting',
+     'phrases': ['hello', 'hi', 'hey', 'hi there', 'hey there', 'greetings'],
+     'responses': ["Hello! How can I help you today? 😊",
+                   "Hey there! What's up? 🐾",
+                   "Hi! Nice to see you! What can I do for you? 👋",
+                   "Greetings! Ready to assist! ✨"]},
+    {'name': 'fallback',
+     'responses': ["I'm here to help! Ask me anything and I'll search the web for answers. 🔍"]},
+]
+
+class IntentRouter:
+    """Canned chat intents, built once. A message is matched as a whole against every intent's
+    phrases with one dict lookup. Intents are given as dicts like BUILTIN_INTENTS; one with an
+    existing name replaces that intent's fields in place."""
+    
+    def __init__(self, intents=BUILTIN_INTENTS):
+        self.intents = {}
+        self.order = []
+        for intent in intents:
+            self.add(intent)
+        self.build()
+    
+    @staticmethod
+    def phrase_key(text):
+        return ' '.join(re.findall(r"[\w']+", text.lower()))
+    
+    def add(self, intent):
+        name = intent['name']
+        if name not in self.intents:
+            self.order.append(name)
+            self.intents[name] = {}
+        self.intents[name].update(intent)
+    
+    def build(self):
+        self.exact = {}
+        self.responses = {}
+        for name in self.order:
+            intent = self.intents[name]
+            self.responses[name] = tuple(intent.get('responses', ()))
+            for phrase in intent.get('phrases', ()):
+                self.exact[self.phrase_key(phrase)] = name
+    
+    def load(self, path):
+        """Merge intents from a JSON list file; returns how many were read"""
+        intents = JsonStore.read(path, [])
+        if not intents:
+            return 0
+        for intent in intents:
+            if isinstance(intent, dict) and intent.get('name'):
+                self.add(intent)
+        self.build()
+        return len(intents)
+    
+    def match_phrase(self, message):
+        return self.exact.get(self.phrase_key(message))
+    
+    def respond(self, name):
+        text = random.choice(self.responses.get(name) or self.responses['fallback'])
+        now = datetime.datetime.now()
+        if '{time}' in text:
+            text = text.replace('{time}', now.strftime("%I:%M %p"))
+        if '{date}' in text:
+            text = text.replace('{date}', now.strftime("%A, %B %d, %Y"))
+        return text
+
+class AnswerIndex:
+    """Past search answers in a SQLite FTS5 index, keyed by the question asked. lookup() finds
+    stored questions sharing words with a new one and accepts the best whose overlap of
+    non-filler words reaches min_similarity. Rows beyond max_rows are dropped oldest first, and the index is
+    optimized and vacuumed every ANSWER_INDEX_COMPACT_EVERY inserts."""
+    
+    def __init__(self, path, max_rows=ANSWER_INDEX_MAX_ROWS, min_similarity=ANSWER_INDEX_MIN_SIMILARITY):
+        self.max_rows = max_rows
+        self.min_similarity = min_similarity
+        self.lock = threading.Lock()
+        self.inserts = 0
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS answers (id INTEGER PRIMARY KEY, query TEXT UNIQUE, "
+                        "answer TEXT, created REAL)")
+        self.db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS answers_fts USING fts5("
+                        "query, answer, content='answers', content_rowid='id')")
+    
+    @staticmethod
+    def words(text, ignore=ANSWER_INDEX_FILLER):
+        return {word for word in QueryCache.normalize(text).split() if word not in ignore}
+    
+    def add(self, query, answer):
+        key = QueryCache.normalize(query)
+        if not key:
+            return
+        with self.lock:
+            self.db.execute("BEGIN")
+            try:
+                self.delete_where("query = ?", (key,))
+                cursor = self.db.execute("INSERT INTO answers (query, answer, created) VALUES (?, ?, ?)",
+                                         (key, answer, time.time()))
+                self.db.execute("INSERT INTO answers_fts (rowid, query, answer) VALUES (?, ?, ?)",
+                                (cursor.lastrowid, key, answer))
+                excess = self.db.execute("SELECT COUNT(*) FROM answers").fetchone()[0] - self.max_rows
+                if excess > 0:
+                    self.delete_where("id IN (SELECT id FROM answers ORDER BY created LIMIT ?)", (excess,))
+                self.db.execute("COMMIT")
+            except sqlite3.Error:
+                self.db.execute("ROLLBACK")
+                raise
+            self.inserts += 1
+            if self.inserts % ANSWER_INDEX_COMPACT_EVERY == 0:
+                self.compact()
+    
+    def delete_where(self, condition, params):
+        rows = self.db.execute(f"SELECT id, query, answer FROM answers WHERE {condition}", params).fetchall()
+        for row in rows:
+            self.db.execute("INSERT INTO answers_fts (answers_fts, rowid, query, answer) VALUES ('delete', ?, ?, ?)", row)
+        self.db.execute(f"DELETE FROM answers WHERE {condition}", params)
+    
+    def lookup(self, query, max_age=None):
+        """Return (answer, similarity, age in seconds) for the closest stored question, or None"""
+        words = self.words(query)
+        terms = self.words(query, ANSWER_INDEX_STOPWORDS)
+        if not terms:
+            return None
+        match = 'query : (' + ' OR '.join(f'"{term}"' for term in terms) + ')'
+        with self.lock:
+            rows = self.db.execute("SELECT a.query, a.answer, a.created FROM answers_fts "
+                                   "JOIN answers a ON a.id = answers_fts.rowid "
+                                   "WHERE answers_fts MATCH ? ORDER BY rank LIMIT 20", (match,)).fetchall()
+        now = time.time()
+        best = None
+        for stored, answer, created in rows:
+            stored_words = self.words(stored)
+            similarity = len(words & stored_words) / len(words | stored_words)
+            age = now - created
+            if similarity >= self.min_similarity and (max_age is None or age <= max_age):
+                if best is None or similarity > best[1]:
+                    best = (answer, similarity, age)
+        return best
+    
+    def compact(self):
+        self.db.execute("INSERT INTO answers_fts (answers_fts) VALUES ('optimize')")
+        self.db.execute("VACUUM")
+    
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+class Summarizer:
+    """Length-budgeted extract of whole sentences. Sentences end at ., ! or ? (plus closing
+    quotes/brackets) before whitespace and a non-lowercase character, except after a known
+    abbreviation or a single-letter initial. Without a query only as much of the text as the
+    budget can reach is normalized and segmented; the summary is built with a single join."""
+    
+    BOUNDARY_RE = re.compile(r'[.!?]+["\'\u201d\u2019)\]]*\s+(?![a-z])')
+    WORD_RE = re.compile(r'\w+')
+    
+    def sentences(self, text):
+        """Yield the sentences of whitespace-normalized text in order"""
+        start = 0
+        for match in self.BOUNDARY_RE.finditer(text):
+            dot = match.start()
+            if text[dot] == '.':
+                word = text[max(text.rfind(' ', start, dot) + 1, start):dot].lower()
+                if word in SUMMARY_ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+                    continue
+            yield text[start:match.end()].rstrip()
+            start = match.end()
+        if start < len(text):
+            yield text[start:]
+    
+    @staticmethod
+    def normalize(content, limit=None):
+        """Collapse whitespace, stopping early once the result is longer than limit"""
+        if limit is not None:
+            size = limit * 2
+            while size < len(content):
+                text = ' '.join(content[:size].split())
+                if len(text) > limit:
+                    return text
+                size *= 2
+        return ' '.join(content.split())
+    
+    def summarize(self, content, max_chars=250, query=None):
+        """Up to max_chars of whole sentences. Without a query this is the leading sentences;
+        with one, the first SUMMARY_RANK_SENTENCES sentences are ranked by shared query words,
+        picked best first and put back in text order. Falls back to a word-boundary cut when that gives 50 chars or fewer."""
+        terms = {w for w in self.WORD_RE.findall(query.lower()) if w not in ANSWER_INDEX_STOPWORDS} if query else None
+        # Only the first max_chars (and the character after a boundary) can matter without ranking
+        text = self.normalize(content, None if terms else max_chars + 2)
+        if len(text) <= max_chars:
+            return text
+        
+        if terms:
+            sentences = list(itertools.islice(self.sentences(text), SUMMARY_RANK_SENTENCES))
+            scores = [len(terms.intersection(self.WORD_RE.findall(s.lower()))) for s in sentences]
+            candidates = ((sentences[i], i) for i in sorted(range(len(sentences)), key=lambda i: (-scores[i], i)))
+        else:
+            candidates = ((sentence, i) for i, sentence in enumerate(self.sentences(text)))
+        
+        chosen = []
+        length = -1
+        for sentence, i in candidates:
+            if length + 1 + len(sentence) <= max_chars:
+                chosen.append((i, sentence))
+                length += 1 + len(sentence)
+            elif not terms:
+                break
+        
+        if chosen and length > 50:
+            return ' '.join(sentence for i, sentence in sorted(chosen))
+        
+        truncated = text[:max_chars]
+        last_space = truncated.rfind(' ')
+        if last_space > 0:
+            return truncated[:last_space] + "..."
+        
+        return truncated + "..."
+
+class NameIndex:
+    """Name lookup for shortcut/URL entries. Word-prefix matches come from a sorted key
+    list searched with bisect; a trigram index supplies fuzzy matches as a fallback."""
+    
+    def __init__(self, items=()):
+        self.items = {}
+        self.names = {}
+        self.keys = []
+        self.trigrams = {}
+        for item in items:
+            self.add(item, keep_sorted=False)
+        self.keys.sort()
+    
+    @staticmethod
+    def normalize(text):
+        return ' '.join(re.findall(r'\w+', text.lower()))
+    
+    @staticmethod
+    def split_trigrams(text):
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+    
+    def word_keys(self, name):
+        """Every word-start suffix of the name, so 'vs code' is found by 'vs' and 'co'"""
+        words = name.split()
+        return [' '.join(words[i:]) for i in range(len(words))]
+    
+    def add(self, item, keep_sorted=True):
+        item_id = id(item)
+        name = self.normalize(item.get('name', ''))
+        self.items[item_id] = item
+        self.names[item_id] = name
+        for key in self.word_keys(name):
+            if keep_sorted:
+                bisect.insort(self.keys, (key, item_id))
+            else:
+                self.keys.append((key, item_id))
+        for trigram in self.split_trigrams(name):
+            self.trigrams.setdefault(trigram, set()).add(item_id)
+    
+    def remove(self, item):
+        item_id = id(item)
+        name = self.names.pop(item_id, None)
+        if name is None:
+            return
+        del self.items[item_id]
+        for key in self.word_keys(name):
+            i = bisect.bisect_left(self.keys, (key, item_id))
+            if i < len(self.keys) and self.keys[i] == (key, item_id):
+                del self.keys[i]
+        for trigram in self.split_trigrams(name):
+            postings = self.trigrams.get(trigram)
+            if postings:
+                postings.discard(item_id)
+    
+    def search(self, query, limit=SEARCH_RESULT_LIMIT):
+        """Return up to limit (score, item) pairs: whole-name prefixes score 3, word prefixes 2,
+        fuzzy matches the fraction of shared trigrams"""
+        query = self.normalize(query)
+        if not query:
+            return []
+        scores = {}
+        i = bisect.bisect_left(self.keys, (query,))
+        while i < len(self.keys) and len(scores) < limit:
+            key, item_id = self.keys[i]
+            if not key.startswith(query):
+                break
+            scores[item_id] = max(scores.get(item_id, 0), 3 if key == self.names[item_id] else 2)
+            i += 1
+        
+        if len(scores) < limit and len(query) >= 3:
+            query_trigrams = self.split_trigrams(query)
+            counts = {}
+            for trigram in query_trigrams:
+                for item_id in self.trigrams.get(trigram, ()):
+                    counts[item_id] = counts.get(item_id, 0) + 1
+            needed = max(2, (len(query_trigrams) + 1) // 2)
+            fuzzy = sorted(((n, item_id) for item_id, n in counts.items()
+                            if n >= needed and item_id not in scores), reverse=True)
+            for n, item_id in fuzzy[:limit - len(scores)]:
+                scores[item_id] = n / len(query_trigrams)
+        
+        ranked = sorted(scores.items(), key=lambda pair: (-pair[1], self.names[pair[0]]))
+        return [(score, self.items[item_id]) for item_id, score in ranked]
 
 class DesktopPet:
     def __init__(self):
@@ -53,6 +1111,11 @@ class DesktopPet:
         self.offset_x = 0
         self.offset_y = 0
         self.dragging = False
+        self.drag_job = None
+        self.drag_target = None
+        self.last_drag_move = 0.0
+        self.drag_latency_log = False
+        self.drag_latencies = []
         
         self.app_data_dir = self.get_app_data_directory()
         self.shortcuts_file = os.path.join(self.app_data_dir, 'desktop_pet_shortcuts.json')
@@ -60,19 +1123,87 @@ class DesktopPet:
         self.settings_file = os.path.join(self.app_data_dir, 'desktop_pet_settings.json')
         self.custom_shortcuts = []
         self.custom_urls = []
+        self.name_indexes = {}
         self.stay_on_desktop = tk.BooleanVar(value=False)
         self.custom_image_path = None
+        self.pet_gif_url = None
+        self.remote_gif_checked = set()
+        self.frames = None
+        self.frame_load_generation = 0
+        self.load_progress_label = None
+        self.frame_window = 32
+        self.frame_prefetch = 4
+        self.frame_memory_budget_mb = 64
+        self.idle_timeout = 60
+        self.idle_fps = 2  # only while Desktop Only is on; None never throttles, 0 pauses
+        self.search_cache_disk = True
+        self.answer_index_enabled = True
+        self.summary_relevance = True
+        self.answer_index_max_rows = ANSWER_INDEX_MAX_ROWS
+        self.search_hedge_ms = 0
+        self.search_provider_settings = {}
+        self.search_fixture_file = None
+        self.search_fixture_only = False
+        self.search_fixture_latency_ms = 0
+        self.search_fixture_record = False
+        self.http_retries = 2
+        self.http_backoff = 0.5
+        self.http_per_host = 4
+        self.engine = AsyncEngine()
+        self.search_latency_lock = threading.Lock()
+        self.search_latency = {}
         
         self.console_window = None
         self.console_text = None
-        self.console_buffer = []
+        self.console_buffer = deque(maxlen=CONSOLE_BUFFER_LINES)
+        self.console_pending = []
+        self.console_flush_job = None
+        self.console_log_file = False
+        self.console_file_logger = None
+        self.log_level = logging.INFO
+        self.log_categories = {category: True for category in LOG_CATEGORIES}
+        self.log_stdout = sys.stdout is not None
+        self.log_queue = queue.SimpleQueue()
+        self.main_thread = threading.current_thread()
         
         self.chat_window = None
         self.chat_display = None
         self.chat_input = None
-        self.chat_history = []
-        
+        self.chat_shown = deque()
+        self.chat_recent = deque(maxlen=CHAT_WIDGET_MESSAGES)
+        self.chat_at_tail = True
+        self.chat_mark_seq = 0
+        self.chat_slots = asyncio.Semaphore(CHAT_WORKERS)
+        self.chat_inflight = {}
+        self.chat_waiting = deque()
+        
+        self.storage = Storage(os.path.join(self.app_data_dir, 'data'), self.root.after,
+                               functools.partial(self.log_to_console, category='storage'))
+        self.settings_store = self.storage.open('settings', {}, self.settings_file)
+        self.shortcuts_store = self.storage.open('shortcuts', [], self.shortcuts_file)
+        self.urls_store = self.storage.open('urls', [], self.urls_file)
+        self.chat_transcript = ChatTranscript(os.path.join(self.storage.directory, 'chat_history.jsonl'))
         self.load_settings()
+        self.http = HttpClient(self.http_retries, self.http_backoff, self.http_per_host)
+        self.setup_search_providers()
+        self.intent_router = IntentRouter()
+        self.summarizer = Summarizer()
+        intents_file = os.path.join(self.app_data_dir, 'intents.json')
+        if os.path.exists(intents_file):
+            self.log_to_console("Loaded %d chat intents from %s", self.intent_router.load(intents_file),
+                                intents_file, category='storage')
+        self.search_cache = QueryCache(store=self.storage.open('search_cache', {}) if self.search_cache_disk else None,
+                                       after=self.root.after)
+        self.answer_index = None
+        if self.answer_index_enabled:
+            try:
+                self.answer_index = AnswerIndex(os.path.join(self.storage.directory, 'answers.db'),
+                                                self.answer_index_max_rows)
+            except sqlite3.Error as e:
+                # e.g. a Python whose SQLite was built without FTS5
+                self.log_to_console("Answer index unavailable: %s", e, category='storage', level=logging.WARNING)
+        self.load_custom_shortcuts()
+        self.load_custom_urls()
         self.load_gif()
         
         self.label = tk.Label(self.root, bg='black', bd=0)
@@ -83,10 +1214,34 @@ class DesktopPet:
         self.label.bind('<ButtonRelease-1>', self.stop_drag)
         self.label.bind('<Button-3>', self.show_menu)
         
+        # Bound on the toplevel so they also fire for the label without replacing its bindings
+        self.root.bind('<Map>', self.on_map)
+        self.root.bind('<Unmap>', self.on_unmap)
+        # Occlusion is only reported by X11; on Windows <Visibility> never fires
+        self.label.bind('<Visibility>', self.on_visibility)
+        for sequence in ('<Enter>', '<Motion>', '<Button>'):
+            self.root.bind(sequence, self.note_interaction, add='+')
+        
         self.create_menu()
         self.current_frame = 0
+        self.frame_deadline = None
+        self.anim_stats_start = time.monotonic()
+        self.anim_shown = self.anim_dropped = 0
+        self.animate_job = None
+        self.pet_visible = True
+        self.last_interaction = time.monotonic()
+        self.power_mode = 'active'
+        self.power_mode_since = self.last_interaction
+        self.power_mode_time = {'active': 0.0, 'idle': 0.0, 'hidden': 0.0}
+        self.drain_log_queue()
         self.animate()
         self.root.mainloop()
+        self.storage.flush()
+        self.chat_transcript.close()
+        self.engine.close()
+        self.http.close()
+        if self.answer_index:
+            self.answer_index.close()
     
     def get_app_data_directory(self):
         system = platform.system()
@@ -102,80 +1257,580 @@ class DesktopPet:
         return app_data
     
     def load_gif(self):
+        self.frame_load_generation += 1
         try:
             if self.custom_image_path and os.path.exists(self.custom_image_path):
-                img = Image.open(self.custom_image_path)
+                source_path = self.custom_image_path
             else:
-                url = "https://media.tenor.com/Ot-v5CHE2TUAAAAM/yoojung-gif-kim-yoo-jung.gif"
-                verify_ssl = not getattr(sys, 'frozen', False)
-                response = requests.get(url, timeout=5, verify=verify_ssl)
-                img = Image.open(BytesIO(response.content))
+                url = self.pet_gif_url or DEFAULT_GIF_URL
+                source_path = self.get_remote_gif_path(url)
+                self.start_remote_gif_refresh(url)
+                if not os.path.exists(source_path):
+                    self.set_single_frame(self.make_placeholder_frame())
+                    return
             
-            self.frames = []
+            img = Image.open(source_path)
             w, h = img.size
-            nw, nh = int(w * 0.6), int(h * 0.6)
+            nw, nh = int(w * FRAME_SCALE), int(h * FRAME_SCALE)
             
+            cache_key = self.get_frame_cache_key(source_path, (nw, nh))
+            cached = self.load_cached_frames(cache_key) if cache_key else None
+            if cached:
+                self.log_to_console("Loaded %d frames from cache", cached[0], category='image')
+                self.set_frames(*cached)
+            elif cache_key:
+                if not self.frames:
+                    self.set_single_frame(self.make_placeholder_frame())
+                self.start_frame_build(source_path, cache_key, (nw, nh))
+            else:
+                self.set_frames(*self.make_frame_decoder(img, (nw, nh)))
+        except Exception as e:
+            self.log_to_console("Error loading image: %s", e, category='image', level=logging.ERROR)
+            self.set_single_frame(Image.new('RGBA', (80, 80), (255, 0, 0, 255)))
+    
+    def set_frames(self, count, size, loader, durations=None, keyframe=None, close=None):
+        self.replace_frames(self.make_frame_provider(loader, count, size, durations, keyframe, close))
+        self.root.geometry(f'{size[0]}x{size[1]}')
+    
+    def set_single_frame(self, frame):
+        self.replace_frames(self.make_frame_provider(lambda i: (frame, (0, 0)), 1, frame.size))
+    
+    def replace_frames(self, provider):
+        """Swap in a new frame provider, releasing the old one and anything it had open"""
+        previous, self.frames = self.frames, provider
+        self.current_frame = 0
+        self.frame_deadline = None
+        if previous is not None:
+            previous.release()
+    
+    def start_frame_build(self, source_path, cache_key, size):
+        """Fill the frame cache on a background thread; frames are swapped in when it is done"""
+        generation = self.frame_load_generation
+        started = time.monotonic()
+        
+        def report(done, total):
+            self.root.after(0, lambda: self.show_load_progress(generation, started, done, total))
+        
+        def worker():
             try:
-                img.seek(1)
-                is_animated = True
-                img.seek(0)
+                img = Image.open(source_path)
+                durations = []
+                frames = self.preprocess_frames(img, size, durations, report)
+                self.store_cached_frames(cache_key, frames, size, durations)
+                self.log_to_console("Prepared %d frames in %.2fs", len(durations), time.monotonic() - started,
+                                    category='image')
+            except Exception as e:
+                self.log_to_console("Error preparing frames: %s", e, category='image', level=logging.ERROR)
+            self.root.after(0, lambda: self.finish_frame_build(generation, source_path, cache_key, size))
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def finish_frame_build(self, generation, source_path, cache_key, size):
+        if generation != self.frame_load_generation:
+            return
+        self.hide_load_progress()
+        try:
+            cached = self.load_cached_frames(cache_key)
+            if cached:
+                self.set_frames(*cached)
+            else:
+                img = Image.open(source_path)
+                self.set_frames(*self.make_frame_decoder(img, size))
+        except Exception as e:
+            self.log_to_console("Error loading image: %s", e, category='image', level=logging.ERROR)
+            self.set_single_frame(Image.new('RGBA', (80, 80), (255, 0, 0, 255)))
+    
+    def show_load_progress(self, generation, started, done, total):
+        """Show a small progress badge on the pet for loads that take noticeably long"""
+        if generation != self.frame_load_generation or time.monotonic() - started < 0.3:
+            return
+        if self.load_progress_label is None:
+            self.load_progress_label = tk.Label(self.root, bg='#1e1f22', fg='#ffffff', font=('Segoe UI', 8))
+        self.load_progress_label.config(text=f"Loading {done * 100 // max(total, 1)}%")
+        self.load_progress_label.place(relx=0.5, rely=1.0, anchor='s')
+    
+    def hide_load_progress(self):
+        if self.load_progress_label is not None:
+            self.load_progress_label.place_forget()
+    
+    def make_frame_provider(self, loader, count, size, durations=None, keyframe=None, close=None):
+        provider = FrameProvider(loader, count, size, durations, keyframe, window=self.frame_window,
+                                 prefetch=self.frame_prefetch,
+                                 budget_bytes=self.frame_memory_budget_mb << 20, close=close)
+        if count > 1:
+            self.log_to_console("Frame window: %d of %d frames (%d MB budget)", provider.window, count,
+                                self.frame_memory_budget_mb, category='image')
+        return provider
+    
+    def make_frame_decoder(self, img, size):
+        """Return (count, size, loader, durations, keyframe, close) that decode full frames
+        straight from the source image, for when the disk cache is unavailable"""
+        count = getattr(img, 'n_frames', 1)
+        durations = []
+        for index in range(count):
+            img.seek(index)
+            durations.append(img.info.get('duration', DEFAULT_FRAME_DURATION))
+        
+        def loader(index):
+            img.seek(index)
+            return scale_frame(img, size), (0, 0)
+        return count, size, loader, durations, None, img.close
+    
+    def make_placeholder_frame(self):
+        """Frame shown until the remote GIF has been downloaded"""
+        frame = Image.new('RGBA', (80, 80), (0, 0, 0, 0))
+        ImageDraw.Draw(frame).ellipse((10, 10, 70, 70), fill=(88, 101, 242, 255))
+        return frame
+    
+    def get_remote_gif_path(self, url):
+        remote_dir = os.path.join(self.app_data_dir, 'remote_gif')
+        if not os.path.exists(remote_dir):
+            os.makedirs(remote_dir)
+        return os.path.join(remote_dir, hashlib.sha1(url.encode()).hexdigest()[:16] + '.gif')
+    
+    def start_remote_gif_refresh(self, url):
+        """Revalidate the cached remote GIF once per session without blocking the UI"""
+        if url in self.remote_gif_checked:
+            return
+        self.remote_gif_checked.add(url)
+        
+        def worker():
+            try:
+                if self.fetch_remote_gif(url):
+                    self.root.after(0, lambda: self.on_remote_gif_updated(url))
+            except Exception as e:
+                self.log_to_console("Remote image fetch error: %s", e, category='image', level=logging.WARNING)
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def fetch_remote_gif(self, url):
+        """Download url into the on-disk cache, revalidating with ETag/Last-Modified.
+        Returns True when new bytes were stored, False when the cached copy is current."""
+        path = self.get_remote_gif_path(url)
+        meta_path = path + '.json'
+        headers = {}
+        if os.path.exists(path) and os.path.exists(meta_path):
+            try:
+                with open(meta_path, 'r') as f:
+                    meta = json.load(f)
+                if meta.get('etag'):
+                    headers['If-None-Match'] = meta['etag']
+                if meta.get('last_modified'):
+                    headers['If-Modified-Since'] = meta['last_modified']
+            except (OSError, ValueError):
+                pass
+        
+        verify_ssl = not getattr(sys, 'frozen', False)
+        response = self.http.get(url, headers=headers, verify=verify_ssl)
+        if response.status_code == 304:
+            return False
+        response.raise_for_status()
+        Image.open(BytesIO(response.content)).verify()
+        
+        with open(path + '.tmp', 'wb') as f:
+            f.write(response.content)
+        os.replace(path + '.tmp', path)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({'url': url,
+                       'etag': response.headers.get('ETag'),
+                       'last_modified': response.headers.get('Last-Modified')}, f)
+        os.replace(meta_path + '.tmp', meta_path)
+        return True
+    
+    def on_remote_gif_updated(self, url):
+        if (self.pet_gif_url or DEFAULT_GIF_URL) == url and not (
+                self.custom_image_path and os.path.exists(self.custom_image_path)):
+            self.log_to_console("Remote image updated", category='image')
+            self.load_gif()
+    
+    def decode_frames(self, img, durations=None):
+        """Yield every frame of img in order, recording frame durations if asked.
+        Pillow composites GIF frames onto the previous one, honouring disposal, while seeking."""
+        try:
+            img.seek(1)
+            is_animated = True
+            img.seek(0)
+        except EOFError:
+            is_animated = False
+        
+        if is_animated:
+            index = 0
+            try:
+                while True:
+                    if durations is not None:
+                        durations.append(img.info.get('duration', DEFAULT_FRAME_DURATION))
+                    yield img.copy()
+                    index += 1
+                    img.seek(index)
             except EOFError:
-                is_animated = False
+                pass
+        else:
+            if durations is not None:
+                durations.append(DEFAULT_FRAME_DURATION)
+            yield img
+    
+    def preprocess_frames(self, img, size, durations=None, progress=None):
+        """Decode frames in order on the calling thread and convert/resize them on a
+        thread pool (Pillow releases the GIL while resampling). Yields scaled frames in order."""
+        workers = max(1, min(FRAME_WORKERS, os.cpu_count() or 1))
+        total = getattr(img, 'n_frames', 1)
+        step = max(1, total // 20)
+        pending = deque()
+        done = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for frame in self.decode_frames(img, durations):
+                pending.append(pool.submit(scale_frame, frame, size))
+                while len(pending) > workers * 2 or (pending and pending[0].done()):
+                    yield pending.popleft().result()
+                    done += 1
+                    if progress and done % step == 0:
+                        progress(done, total)
+            while pending:
+                yield pending.popleft().result()
+        if progress:
+            progress(total, total)
+    
+    def get_frame_cache_dir(self):
+        cache_dir = os.path.join(self.app_data_dir, 'frame_cache')
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        return cache_dir
+    
+    def get_frame_cache_key(self, path, size):
+        """Content-addressed key: source hash, mtime, target size and resampling filter"""
+        try:
+            digest = hashlib.sha1()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            mtime = os.stat(path).st_mtime_ns
+            digest.update(f"|{mtime}|{size[0]}x{size[1]}|{int(FRAME_RESAMPLE)}|v{FRAME_CACHE_VERSION}".encode())
+            return digest.hexdigest()
+        except OSError as e:
+            self.log_to_console("Frame cache key error: %s", e, category='image', level=logging.WARNING)
+            return None
+    
+    def load_cached_frames(self, key):
+        """Return (count, size, loader, durations, keyframe, close) for frames in the
+        memory-mapped cache, or None on a miss. close() unmaps the cache file."""
+        cache_dir = self.get_frame_cache_dir()
+        index_path = os.path.join(cache_dir, key + '.json')
+        data_path = os.path.join(cache_dir, key + '.rgba')
+        if not (os.path.exists(index_path) and os.path.exists(data_path)):
+            return None
+        try:
+            with open(index_path, 'r') as f:
+                index = json.load(f)
+            size = (index['width'], index['height'])
+            frame_bytes = size[0] * size[1] * 4
+            deltas = index['deltas']
             
-            if is_animated:
-                try:
-                    while True:
-                        frame = img.copy().convert('RGBA').resize((nw, nh), Image.Resampling.LANCZOS)
-                        self.frames.append(ImageTk.PhotoImage(frame))
-                        img.seek(len(self.frames))
-                except EOFError:
-                    pass
-            else:
-                frame = img.convert('RGBA').resize((nw, nh), Image.Resampling.LANCZOS)
-                self.frames.append(ImageTk.PhotoImage(frame))
+            os.utime(index_path)
+            with open(data_path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(data) != index['bytes']:
+                data.close()
+                return None
+            view = memoryview(data)
             
-            if self.frames:
-                self.root.geometry(f'{nw}x{nh}+100+100')
-                self.current_frame = 0
+            def keyframe():
+                return Image.frombuffer('RGBA', size, view[:frame_bytes], 'raw', 'RGBA', 0, 1)
+            
+            def loader(i):
+                if deltas[i] is None:
+                    return None, (0, 0)
+                offset, x0, y0, x1, y1 = deltas[i]
+                box_size = (x1 - x0, y1 - y0)
+                end = offset + box_size[0] * box_size[1] * 4
+                return Image.frombuffer('RGBA', box_size, view[offset:end], 'raw', 'RGBA', 0, 1), (x0, y0)
+            
+            def close():
+                # Frames built from the view are converted to PhotoImages and dropped right
+                # away, so once the provider has released its loader nothing points into the map
+                try:
+                    view.release()
+                    data.close()
+                except BufferError as e:
+                    self.log_to_console("Frame cache still in use, left mapped: %s", e, category='image',
+                                        level=logging.WARNING)
+            return len(deltas), size, loader, index.get('durations'), keyframe, close
         except Exception as e:
-            self.log_to_console(f"Error loading image: {e}")
-            self.frames = [ImageTk.PhotoImage(Image.new('RGBA', (80, 80), (255, 0, 0, 255)))]
+            self.log_to_console("Frame cache read error: %s", e, category='image', level=logging.WARNING)
+            return None
+    
+    def store_cached_frames(self, key, frames, size, durations=None):
+        """Write frames to the cache as one keyframe plus the dirty rectangle of every frame
+        relative to the one before it (frame 0 relative to the last, for looping)"""
+        cache_dir = self.get_frame_cache_dir()
+        index_path = os.path.join(cache_dir, key + '.json')
+        data_path = os.path.join(cache_dir, key + '.rgba')
+        tmp_path = data_path + '.tmp'
+        deltas = []
+        offset = 0
+        
+        def write_delta(previous, frame):
+            nonlocal offset
+            box = frame_delta_box(previous, frame)
+            if box is None:
+                return None
+            data = frame.crop(box).tobytes()
+            writer.write(data)
+            offset += len(data)
+            return [offset - len(data), *box]
+        
+        try:
+            with open(tmp_path, 'wb') as writer:
+                first = previous = None
+                for frame in frames:
+                    if first is None:
+                        first = frame
+                        data = frame.tobytes()
+                        writer.write(data)
+                        offset = len(data)
+                        deltas.append(None)
+                    else:
+                        deltas.append(write_delta(previous, frame))
+                    previous = frame
+                if first is None:
+                    raise OSError("image has no frames")
+                deltas[0] = write_delta(previous, first)
+            
+            os.replace(tmp_path, data_path)
+            with open(index_path + '.tmp', 'w') as f:
+                json.dump({'width': size[0], 'height': size[1], 'durations': durations,
+                           'deltas': deltas, 'bytes': offset}, f)
+            os.replace(index_path + '.tmp', index_path)
+            self.prune_frame_cache()
+            full_bytes = len(deltas) * size[0] * size[1] * 4
+            self.log_to_console("Frame cache: %d frames stored in %.1f MB (%.1f MB as full frames)",
+                                len(deltas), offset / (1 << 20), full_bytes / (1 << 20), category='image')
+            return True
+        except OSError as e:
+            self.log_to_console("Frame cache write error: %s", e, category='image', level=logging.WARNING)
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return False
+    
+    def prune_frame_cache(self):
+        """Keep only the most recently used cache entries"""
+        cache_dir = self.get_frame_cache_dir()
+        indexes = [os.path.join(cache_dir, n) for n in os.listdir(cache_dir) if n.endswith('.json')]
+        indexes.sort(key=os.path.getmtime, reverse=True)
+        for index_path in indexes[FRAME_CACHE_MAX_ENTRIES:]:
+            for path in (index_path, index_path[:-len('.json')] + '.rgba'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
     
     def animate(self):
+        """Show the frame due now and schedule the next tick against a monotonic deadline.
+        Frames whose whole display slot has already passed are skipped to stay in sync."""
+        self.animate_job = None
+        self.update_power_mode()
+        if self.power_mode == 'hidden' or (self.power_mode == 'idle' and self.idle_fps <= 0):
+            return  # paused until wake_animation
+        
+        delay = DEFAULT_FRAME_DURATION
         if self.frames:
-            self.label.config(image=self.frames[self.current_frame])
-            self.current_frame = (self.current_frame + 1) % len(self.frames)
-        self.root.after(100, self.animate)
+            now = time.monotonic()
+            durations = self.frames.durations
+            count = len(self.frames)
+            # Resync instead of fast-forwarding after a long stall (e.g. system sleep)
+            if self.frame_deadline is None or now - self.frame_deadline > 1.0:
+                self.frame_deadline = now
+            while count > 1 and now >= self.frame_deadline + durations[self.current_frame] / 1000:
+                self.frame_deadline += durations[self.current_frame] / 1000
+                self.current_frame = (self.current_frame + 1) % count
+                if self.power_mode == 'active':
+                    self.anim_dropped += 1
+            
+            photo = self.frames.show(self.current_frame)
+            if self.label.cget('image') != str(photo):
+                self.label.config(image=photo)
+            self.anim_shown += 1
+            self.frame_deadline += durations[self.current_frame] / 1000
+            self.current_frame = (self.current_frame + 1) % count
+            self.root.after_idle(self.frames.prefetch, self.current_frame)
+            delay = max(1, int((self.frame_deadline - time.monotonic()) * 1000))
+            self.report_animation_stats(now)
+        if self.power_mode == 'idle':
+            delay = max(delay, int(1000 / self.idle_fps))
+        self.animate_job = self.root.after(delay, self.animate)
+    
+    def wake_animation(self):
+        """Restart a paused or throttled animation loop immediately"""
+        self.update_power_mode()
+        if self.power_mode == 'hidden':
+            return
+        if self.animate_job is not None:
+            self.root.after_cancel(self.animate_job)
+        self.frame_deadline = None
+        self.animate()
+    
+    def update_power_mode(self):
+        now = time.monotonic()
+        if not self.pet_visible:
+            mode = 'hidden'
+        elif (self.idle_fps is not None and self.stay_on_desktop.get()
+              and now - self.last_interaction >= self.idle_timeout):
+            mode = 'idle'
+        else:
+            mode = 'active'
+        if mode != self.power_mode:
+            self.power_mode_time[self.power_mode] += now - self.power_mode_since
+            self.power_mode, self.power_mode_since = mode, now
+            self.log_to_console("Power mode: %s (%s)", mode, self.format_power_mode_time(), category='ui')
+    
+    def format_power_mode_time(self):
+        totals = dict(self.power_mode_time)
+        totals[self.power_mode] += time.monotonic() - self.power_mode_since
+        return ', '.join(f"{mode} {seconds:.0f}s" for mode, seconds in totals.items())
+    
+    def note_interaction(self, e=None):
+        self.last_interaction = time.monotonic()
+        if self.power_mode == 'idle':
+            self.wake_animation()
+    
+    def on_map(self, e):
+        if e.widget is self.root:
+            self.pet_visible = True
+            self.wake_animation()
+    
+    def on_unmap(self, e):
+        if e.widget is self.root:
+            self.pet_visible = False
+    
+    def on_visibility(self, e):
+        visible = e.state != 'VisibilityFullyObscured'
+        if visible != self.pet_visible:
+            self.pet_visible = visible
+            if visible:
+                self.wake_animation()
+    
+    def report_animation_stats(self, now):
+        elapsed = now - self.anim_stats_start
+        if elapsed < ANIM_STATS_INTERVAL:
+            return
+        if self.console_window and self.console_window.winfo_exists():
+            self.log_to_console("Animation: %.1f fps, %d dropped frames in %.0fs, %.1f MB of frames [%s; %s]",
+                                self.anim_shown / elapsed, self.anim_dropped, elapsed,
+                                self.frames.memory_bytes / (1 << 20), self.power_mode,
+                                self.format_power_mode_time(), category='image')
+        self.anim_stats_start = now
+        self.anim_shown = self.anim_dropped = 0
     
     def start_drag(self, e):
         self.dragging = True
-        self.offset_x, self.offset_y = e.x, e.y
+        # Window origin and pointer are captured once; motion events then only need
+        # their root-relative coordinates, with no winfo_* round trips to the X server
+        self.offset_x, self.offset_y = self.root.winfo_x(), self.root.winfo_y()
+        self.drag_start = (e.x_root, e.y_root)
+        self.drag_target = None
+        self.drag_events = self.drag_moves = 0
+        self.drag_latencies = []
     
     def drag(self, e):
-        if self.dragging:
-            self.root.geometry(f'+{self.root.winfo_x() + e.x - self.offset_x}+{self.root.winfo_y() + e.y - self.offset_y}')
+        if not self.dragging:
+            return
+        self.drag_target = (self.offset_x + e.x_root - self.drag_start[0],
+                            self.offset_y + e.y_root - self.drag_start[1])
+        self.drag_events += 1
+        if self.drag_job is None:
+            # Coalesce a burst of motion events into one geometry update per display frame
+            now = time.monotonic()
+            self.drag_pending_since = now
+            wait = max(0, DRAG_FRAME_MS - int((now - self.last_drag_move) * 1000))
+            self.drag_job = self.root.after(wait, self.flush_drag)
+    
+    def flush_drag(self):
+        self.drag_job = None
+        if self.drag_target is None:
+            return
+        self.root.geometry(f'+{self.drag_target[0]}+{self.drag_target[1]}')
+        self.drag_target = None
+        self.last_drag_move = time.monotonic()
+        self.drag_moves += 1
+        if self.drag_latency_log:
+            self.drag_latencies.append(self.last_drag_move - self.drag_pending_since)
     
     def stop_drag(self, e):
+        if self.drag_job is not None:
+            self.root.after_cancel(self.drag_job)
+            self.flush_drag()
         self.dragging = False
+        if self.drag_latency_log and self.drag_latencies:
+            latencies = sorted(self.drag_latencies)
+            self.log_to_console("Drag: %d motion events, %d moves, event-to-move latency "
+                                "avg %.1f ms, p95 %.1f ms, max %.1f ms",
+                                self.drag_events, self.drag_moves, sum(latencies) / len(latencies) * 1000,
+                                latencies[int(len(latencies) * 0.95)] * 1000, latencies[-1] * 1000,
+                                category='ui')
     
     def load_settings(self):
-        try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    s = json.load(f)
-                    self.stay_on_desktop.set(s.get('stay_on_desktop', False))
-                    self.custom_image_path = s.get('custom_image_path')
-                    self.update_window_level()
-        except:
-            pass
+        s = self.settings_store.load()
+        self.stay_on_desktop.set(s.get('stay_on_desktop', False))
+        self.custom_image_path = s.get('custom_image_path')
+        self.pet_gif_url = s.get('pet_gif_url')
+        self.frame_window = s.get('frame_window', self.frame_window)
+        self.frame_prefetch = s.get('frame_prefetch', self.frame_prefetch)
+        self.frame_memory_budget_mb = s.get('frame_memory_budget_mb', self.frame_memory_budget_mb)
+        self.idle_timeout = s.get('idle_timeout', self.idle_timeout)
+        self.idle_fps = s.get('idle_fps', self.idle_fps)
+        self.search_cache_disk = s.get('search_cache_disk', self.search_cache_disk)
+        self.answer_index_enabled = s.get('answer_index', self.answer_index_enabled)
+        self.summary_relevance = s.get('summary_relevance', self.summary_relevance)
+        self.answer_index_max_rows = s.get('answer_index_max_rows', self.answer_index_max_rows)
+        self.search_hedge_ms = s.get('search_hedge_ms', self.search_hedge_ms)
+        self.search_provider_settings = s.get('search_providers', self.search_provider_settings)
+        self.search_fixture_file = s.get('search_fixture_file', self.search_fixture_file)
+        self.search_fixture_only = s.get('search_fixture_only', self.search_fixture_only)
+        self.search_fixture_latency_ms = s.get('search_fixture_latency_ms', self.search_fixture_latency_ms)
+        self.search_fixture_record = s.get('search_fixture_record', self.search_fixture_record)
+        self.http_retries = s.get('http_retries', self.http_retries)
+        self.http_backoff = s.get('http_backoff', self.http_backoff)
+        self.http_per_host = s.get('http_per_host', self.http_per_host)
+        self.drag_latency_log = s.get('drag_latency_log', self.drag_latency_log)
+        self.console_log_file = s.get('console_log_file', self.console_log_file)
+        level = s.get('log_level', logging.getLevelName(self.log_level))
+        self.log_level = level if isinstance(level, int) else getattr(logging, str(level).upper(), logging.INFO)
+        self.log_categories.update(s.get('log_categories', {}))
+        self.log_stdout = s.get('log_stdout', self.log_stdout)
+        self.setup_console_log_file()
+        self.update_window_level()
     
     def save_settings(self):
-        try:
-            with open(self.settings_file, 'w') as f:
-                json.dump({'stay_on_desktop': self.stay_on_desktop.get(), 
-                          'custom_image_path': self.custom_image_path}, f, indent=2)
-        except:
-            pass
+        s = self.settings_store.load()
+        s.update({'stay_on_desktop': self.stay_on_desktop.get(),
+                  'custom_image_path': self.custom_image_path,
+                  'pet_gif_url': self.pet_gif_url,
+                  'frame_window': self.frame_window,
+                  'frame_prefetch': self.frame_prefetch,
+                  'frame_memory_budget_mb': self.frame_memory_budget_mb,
+                  'idle_timeout': self.idle_timeout,
+                  'idle_fps': self.idle_fps,
+                  'search_cache_disk': self.search_cache_disk,
+                  'answer_index': self.answer_index_enabled,
+                  'summary_relevance': self.summary_relevance,
+                  'answer_index_max_rows': self.answer_index_max_rows,
+                  'search_hedge_ms': self.search_hedge_ms,
+                  'search_providers': self.search_provider_settings,
+                  'search_fixture_file': self.search_fixture_file,
+                  'search_fixture_only': self.search_fixture_only,
+                  'search_fixture_latency_ms': self.search_fixture_latency_ms,
+                  'search_fixture_record': self.search_fixture_record,
+                  'http_retries': self.http_retries,
+                  'http_backoff': self.http_backoff,
+                  'http_per_host': self.http_per_host,
+                  'drag_latency_log': self.drag_latency_log,
+                  'console_log_file': self.console_log_file,
+                  'log_level': logging.getLevelName(self.log_level),
+                  'log_categories': self.log_categories,
+                  'log_stdout': self.log_stdout})
+        self.settings_store.save(s)
     
     def update_window_level(self):
         self.root.attributes('-topmost', not self.stay_on_desktop.get())
@@ -185,48 +1840,19 @@ class DesktopPet:
     def toggle_stay_on_desktop(self):
         self.update_window_level()
         self.save_settings()
+        self.wake_animation()
     
     def load_custom_shortcuts(self):
-        try:
-            if os.path.exists(self.shortcuts_file):
-                with open(self.shortcuts_file, 'r') as f:
-                    self.custom_shortcuts = json.load(f)
-            else:
-                self.custom_shortcuts = []
-        except:
-            self.custom_shortcuts = []
+        self.custom_shortcuts = self.shortcuts_store.load()
     
     def load_custom_urls(self):
-        try:
-            if os.path.exists(self.urls_file):
-                with open(self.urls_file, 'r') as f:
-                    self.custom_urls = json.load(f)
-            else:
-                self.custom_urls = []
-        except:
-            self.custom_urls = []
+        self.custom_urls = self.urls_store.load()
     
     def save_custom_shortcuts(self):
-        try:
-            with open(self.shortcuts_file, 'w') as f:
-                json.dump(self.custom_shortcuts, f, indent=2)
-        except:
-            pass
+        self.shortcuts_store.save(self.custom_shortcuts)
     
     def save_custom_urls(self):
-        try:
-            with open(self.urls_file, 'w') as f:
-                json.dump(self.custom_urls, f, indent=2)
-        except:
-            pass
-    
-    def recreate_menu(self):
-        try:
-            if hasattr(self, 'menu'):
-                self.menu.delete(0, 'end')
-        except:
-            pass
-        self.create_menu()
+        self.urls_store.save(self.custom_urls)
     
     def create_menu(self):
         self.menu = TkMenu(self.root, tearoff=0, bg='#3d3d5c', fg='#ffffff',
@@ -236,37 +1862,17 @@ class DesktopPet:
         self.menu.add_command(label="  📝 Notepad", command=self.open_notepad)
         self.menu.add_command(label="  🔢 Calculator", command=self.open_calculator)
         self.menu.add_command(label="  📂 Downloads", command=self.open_downloads)
+        self.menu.add_command(label="  🔎 Quick Launch", command=self.show_quick_launch)
         self.menu.add_separator()
         
-        self.load_custom_shortcuts()
-        self.load_custom_urls()
-        
-        self.apps_submenu = TkMenu(self.menu, tearoff=0, bg='#3d3d5c', fg='#ffffff',
-                                   activebackground='#4d4d6c', activeforeground='#ffffff',
-                                   relief='solid', bd=1, font=('Segoe UI', 10))
-        if self.custom_shortcuts:
-            for s in self.custom_shortcuts:
-                self.apps_submenu.add_command(label=f"  {s.get('name', 'Unknown')}", 
-                                              command=lambda p=s.get('path', ''): self.open_custom_path(p))
-        else:
-            self.apps_submenu.add_command(label="  (No apps)", state='disabled')
-        self.apps_submenu.add_separator()
-        self.apps_submenu.add_command(label="  ➕ Add", command=self.add_custom_shortcut)
-        self.apps_submenu.add_command(label="  🗑️ Remove", command=self.delete_custom_shortcut)
+        # Submenus are filled lazily when first posted, and again only after an edit
+        # that could not be applied in place
+        self.apps_submenu = TkMenu(self.menu, postcommand=self.refresh_apps_submenu, **MENU_STYLE)
+        self.apps_menu_dirty = True
         self.menu.add_cascade(label="  💻 My Apps", menu=self.apps_submenu)
         
-        self.urls_submenu = TkMenu(self.menu, tearoff=0, bg='#3d3d5c', fg='#ffffff',
-                                   activebackground='#4d4d6c', activeforeground='#ffffff',
-                                   relief='solid', bd=1, font=('Segoe UI', 10))
-        if self.custom_urls:
-            for u in self.custom_urls:
-                self.urls_submenu.add_command(label=f"  {u.get('name', 'Unknown')}", 
-                                             command=lambda url=u.get('url', ''): self.open_url(url))
-        else:
-            self.urls_submenu.add_command(label="  (No URLs)", state='disabled')
-        self.urls_submenu.add_separator()
-        self.urls_submenu.add_command(label="  ➕ Add", command=self.add_custom_url)
-        self.urls_submenu.add_command(label="  🗑️ Remove", command=self.delete_custom_url)
+        self.urls_submenu = TkMenu(self.menu, postcommand=self.refresh_urls_submenu, **MENU_STYLE)
+        self.urls_menu_dirty = True
         self.menu.add_cascade(label="  🌐 My URLs", menu=self.urls_submenu)
         
         self.menu.add_separator()
@@ -283,6 +1889,139 @@ class DesktopPet:
         self.menu.add_command(label="  ❌ Close", command=self.root.quit,
                              foreground='#ff6b6b', activeforeground='#ff8888')
     
+    def shortcut_menu_entry(self, s):
+        return f"  {s.get('name', 'Unknown')}", lambda p=s.get('path', ''): self.open_custom_path(p)
+    
+    def url_menu_entry(self, u):
+        return f"  {u.get('name', 'Unknown')}", lambda url=u.get('url', ''): self.open_url(url)
+    
+    def refresh_apps_submenu(self):
+        if self.apps_menu_dirty:
+            self.build_list_submenu(self.apps_submenu, self.custom_shortcuts, self.shortcut_menu_entry,
+                                    "  (No apps)", self.add_custom_shortcut, self.delete_custom_shortcut)
+            self.apps_menu_dirty = False
+    
+    def refresh_urls_submenu(self):
+        if self.urls_menu_dirty:
+            self.build_list_submenu(self.urls_submenu, self.custom_urls, self.url_menu_entry,
+                                    "  (No URLs)", self.add_custom_url, self.delete_custom_url)
+            self.urls_menu_dirty = False
+    
+    def build_list_submenu(self, submenu, items, entry_fn, placeholder, add_command, remove_command):
+        submenu.delete(0, 'end')
+        for child in submenu.winfo_children():
+            child.destroy()
+        if items:
+            self.populate_menu_range(submenu, items, 0, len(items), entry_fn)
+        else:
+            submenu.add_command(label=placeholder, state='disabled')
+        submenu.add_separator()
+        submenu.add_command(label="  ➕ Add", command=add_command)
+        submenu.add_command(label="  🗑️ Remove", command=remove_command)
+    
+    def populate_menu_range(self, menu, items, lo, hi, entry_fn):
+        """Fill menu with items[lo:hi]. Larger ranges are split into cascades that populate
+        themselves when first opened, so no menu ever holds more than MENU_PAGE_SIZE rows."""
+        if hi - lo <= MENU_PAGE_SIZE:
+            for item in items[lo:hi]:
+                label, command = entry_fn(item)
+                menu.add_command(label=label, command=command)
+            return
+        
+        span = MENU_PAGE_SIZE
+        while span * MENU_PAGE_SIZE < hi - lo:
+            span *= MENU_PAGE_SIZE
+        
+        def populate_page(page, start, end):
+            if page.index('end') is None:
+                self.populate_menu_range(page, items, start, end, entry_fn)
+        
+        for start in range(lo, hi, span):
+            end = min(start + span, hi)
+            page = TkMenu(menu, **MENU_STYLE)
+            page.configure(postcommand=lambda p=page, a=start, b=end: populate_page(p, a, b))
+            first, last = items[start].get('name', 'Unknown'), items[end - 1].get('name', 'Unknown')
+            menu.add_cascade(label=f"  {first} … {last}  ({start + 1}-{end})", menu=page)
+    
+    def get_name_index(self, kind):
+        """Name index over 'apps' or 'urls', built on first use and kept in sync by add/remove"""
+        if kind not in self.name_indexes:
+            items = self.custom_shortcuts if kind == 'apps' else self.custom_urls
+            self.name_indexes[kind] = NameIndex(items)
+        return self.name_indexes[kind]
+    
+    def find_entries(self, kind, query, limit):
+        items = self.custom_shortcuts if kind == 'apps' else self.custom_urls
+        if not query.strip():
+            return items[:limit]
+        return [item for _, item in self.get_name_index(kind).search(query, limit)]
+    
+    def insert_menu_entry(self, submenu, index, entry, was_empty):
+        """Insert one entry into a submenu instead of rebuilding the whole menu"""
+        if was_empty:
+            submenu.delete(0)
+        label, command = entry
+        submenu.insert_command(index, label=label, command=command)
+    
+    def remove_menu_entry(self, submenu, index, now_empty, placeholder):
+        submenu.delete(index)
+        if now_empty:
+            submenu.insert_command(0, label=placeholder, state='disabled')
+    
+    def show_quick_launch(self):
+        win = tk.Toplevel(self.root)
+        win.title("Quick Launch")
+        win.geometry("400x450")
+        win.configure(bg='#1e1e1e')
+        win.attributes('-topmost', True)
+        
+        tk.Label(win, text="Quick Launch", bg='#1e1e1e', fg='#fff',
+                font=('Segoe UI', 16, 'bold')).pack(pady=(20, 10))
+        
+        search = tk.Entry(win, bg='#2d2d30', fg='#f0f0f0', font=('Segoe UI', 11), relief='flat',
+                          insertbackground='#f0f0f0')
+        search.pack(fill=tk.X, padx=20, pady=(0, 10), ipady=6)
+        
+        lb = tk.Listbox(win, bg='#2d2d30', fg='#f0f0f0', font=('Segoe UI', 10),
+                       selectbackground='#3e3e42', selectforeground='#fff', relief='flat')
+        lb.pack(fill=tk.BOTH, expand=True, padx=20)
+        
+        status = tk.Label(win, text=f"Search {len(self.custom_shortcuts) + len(self.custom_urls)} apps and URLs",
+                          bg='#1e1e1e', fg='#949ba4', font=('Segoe UI', 9))
+        status.pack(pady=10)
+        
+        results = []
+        
+        def refresh(e=None):
+            started = time.perf_counter()
+            matches = [(score, 'apps', item) for score, item in self.get_name_index('apps').search(search.get())]
+            matches += [(score, 'urls', item) for score, item in self.get_name_index('urls').search(search.get())]
+            matches.sort(key=lambda match: -match[0])
+            results[:] = matches[:SEARCH_RESULT_LIMIT]
+            elapsed = (time.perf_counter() - started) * 1000
+            lb.delete(0, tk.END)
+            lb.insert(tk.END, *(f"  {'📎' if kind == 'apps' else '🌐'} {item.get('name', 'Unknown')}"
+                                for _, kind, item in results))
+            if results:
+                lb.selection_set(0)
+            status.config(text=f"{len(results)} matches in {elapsed:.2f} ms")
+        
+        def launch(e=None):
+            sel = lb.curselection()
+            if results:
+                _, kind, item = results[sel[0] if sel else 0]
+                win.destroy()
+                if kind == 'apps':
+                    self.open_custom_path(item.get('path', ''))
+                else:
+                    self.open_url(item.get('url', ''))
+        
+        search.bind('<KeyRelease>', lambda e: refresh() if e.keysym not in ('Return', 'Escape') else None)
+        search.bind('<Return>', launch)
+        search.bind('<Escape>', lambda e: win.destroy())
+        lb.bind('<Double-Button-1>', launch)
+        search.focus_set()
+    
     def show_menu(self, e):
         try:
             self.menu.tk_popup(e.x_root, e.y_root)
@@ -347,9 +2086,16 @@ class DesktopPet:
             return
         url = simpledialog.askstring("Enter URL", "Enter full URL (https://...):")
         if url and url.startswith(('http://', 'https://')):
-            self.custom_urls.append({'name': name, 'url': url})
+            item = {'name': name, 'url': url}
+            self.custom_urls.append(item)
             self.save_custom_urls()
-            self.recreate_menu()
+            if 'urls' in self.name_indexes:
+                self.name_indexes['urls'].add(item)
+            if not self.urls_menu_dirty and len(self.custom_urls) <= MENU_PAGE_SIZE:
+                self.insert_menu_entry(self.urls_submenu, len(self.custom_urls) - 1,
+                                       self.url_menu_entry(item), len(self.custom_urls) == 1)
+            else:
+                self.urls_menu_dirty = True
             messagebox.showinfo("Success", f"Added: {name}")
     
     def delete_custom_url(self):
@@ -366,19 +2112,28 @@ class DesktopPet:
         tk.Label(win, text="Delete URL", bg='#1e1e1e', fg='#fff',
                 font=('Segoe UI', 16, 'bold')).pack(pady=20)
         
+        search = tk.Entry(win, bg='#2d2d30', fg='#f0f0f0', font=('Segoe UI', 10), relief='flat',
+                          insertbackground='#f0f0f0')
+        search.pack(fill=tk.X, padx=20, pady=(0, 10), ipady=4)
+        
         lb = tk.Listbox(win, bg='#2d2d30', fg='#f0f0f0', font=('Segoe UI', 10),
                        selectbackground='#3e3e42', selectforeground='#fff', relief='flat')
         lb.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
         
-        for u in self.custom_urls:
-            lb.insert(tk.END, f"  🌐 {u['name']}")
+        shown = []
+        
+        def refresh(e=None):
+            shown[:] = self.find_entries('urls', search.get(), DELETE_DIALOG_LIMIT)
+            lb.delete(0, tk.END)
+            lb.insert(tk.END, *(f"  🌐 {u['name']}" for u in shown))
+        
+        search.bind('<KeyRelease>', refresh)
+        refresh()
         
         def do_del():
             sel = lb.curselection()
-            if sel and messagebox.askyesno("Confirm", f"Delete '{self.custom_urls[sel[0]]['name']}'?"):
-                self.custom_urls.pop(sel[0])
-                self.save_custom_urls()
-                self.recreate_menu()
+            if sel and messagebox.askyesno("Confirm", f"Delete '{shown[sel[0]]['name']}'?"):
+                self.remove_custom_url(shown[sel[0]])
                 win.destroy()
         
         frm = tk.Frame(win, bg='#1e1e1e')
@@ -388,6 +2143,17 @@ class DesktopPet:
         tk.Button(frm, text="Cancel", command=win.destroy, bg='#424242', fg='white',
                  font=('Segoe UI', 10), padx=25, pady=8, relief='flat').pack(side=tk.LEFT, padx=5)
     
+    def remove_custom_url(self, item):
+        index = next(i for i, u in enumerate(self.custom_urls) if u is item)
+        self.custom_urls.pop(index)
+        self.save_custom_urls()
+        if 'urls' in self.name_indexes:
+            self.name_indexes['urls'].remove(item)
+        if not self.urls_menu_dirty and len(self.custom_urls) < MENU_PAGE_SIZE:
+            self.remove_menu_entry(self.urls_submenu, index, not self.custom_urls, "  (No URLs)")
+        else:
+            self.urls_menu_dirty = True
+    
     def open_url(self, url):
         try:
             webbrowser.open(url)
@@ -407,9 +2173,16 @@ class DesktopPet:
             path = filedialog.askdirectory() if fc == 'yes' else simpledialog.askstring("Path", "Enter command:")
         
         if path:
-            self.custom_shortcuts.append({'name': name, 'path': path})
+            item = {'name': name, 'path': path}
+            self.custom_shortcuts.append(item)
             self.save_custom_shortcuts()
-            self.recreate_menu()
+            if 'apps' in self.name_indexes:
+                self.name_indexes['apps'].add(item)
+            if not self.apps_menu_dirty and len(self.custom_shortcuts) <= MENU_PAGE_SIZE:
+                self.insert_menu_entry(self.apps_submenu, len(self.custom_shortcuts) - 1,
+                                       self.shortcut_menu_entry(item), len(self.custom_shortcuts) == 1)
+            else:
+                self.apps_menu_dirty = True
             messagebox.showinfo("Success", f"Added: {name}")
     
     def delete_custom_shortcut(self):
@@ -426,19 +2199,28 @@ class DesktopPet:
         tk.Label(win, text="Delete Shortcut", bg='#1e1e1e', fg='#fff',
                 font=('Segoe UI', 16, 'bold')).pack(pady=20)
         
+        search = tk.Entry(win, bg='#2d2d30', fg='#f0f0f0', font=('Segoe UI', 10), relief='flat',
+                          insertbackground='#f0f0f0')
+        search.pack(fill=tk.X, padx=20, pady=(0, 10), ipady=4)
+        
         lb = tk.Listbox(win, bg='#2d2d30', fg='#f0f0f0', font=('Segoe UI', 10),
                        selectbackground='#3e3e42', selectforeground='#fff', relief='flat')
         lb.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
         
-        for s in self.custom_shortcuts:
-            lb.insert(tk.END, f"  📎 {s['name']}")
+        shown = []
+        
+        def refresh(e=None):
+            shown[:] = self.find_entries('apps', search.get(), DELETE_DIALOG_LIMIT)
+            lb.delete(0, tk.END)
+            lb.insert(tk.END, *(f"  📎 {s['name']}" for s in shown))
+        
+        search.bind('<KeyRelease>', refresh)
+        refresh()
         
         def do_del():
             sel = lb.curselection()
-            if sel and messagebox.askyesno("Confirm", f"Delete '{self.custom_shortcuts[sel[0]]['name']}'?"):
-                self.custom_shortcuts.pop(sel[0])
-                self.save_custom_shortcuts()
-                self.recreate_menu()
+            if sel and messagebox.askyesno("Confirm", f"Delete '{shown[sel[0]]['name']}'?"):
+                self.remove_custom_shortcut(shown[sel[0]])
                 win.destroy()
         
         frm = tk.Frame(win, bg='#1e1e1e')
@@ -448,6 +2230,17 @@ class DesktopPet:
         tk.Button(frm, text="Cancel", command=win.destroy, bg='#424242', fg='white',
                  font=('Segoe UI', 10), padx=25, pady=8, relief='flat').pack(side=tk.LEFT, padx=5)
     
+    def remove_custom_shortcut(self, item):
+        index = next(i for i, s in enumerate(self.custom_shortcuts) if s is item)
+        self.custom_shortcuts.pop(index)
+        self.save_custom_shortcuts()
+        if 'apps' in self.name_indexes:
+            self.name_indexes['apps'].remove(item)
+        if not self.apps_menu_dirty and len(self.custom_shortcuts) < MENU_PAGE_SIZE:
+            self.remove_menu_entry(self.apps_submenu, index, not self.custom_shortcuts, "  (No apps)")
+        else:
+            self.apps_menu_dirty = True
+    
     def open_custom_path(self, path):
         system = platform.system()
         try:
@@ -497,12 +2290,76 @@ class DesktopPet:
 
 Settings save automatically!""")
     
-    def log_to_console(self, msg):
-        self.console_buffer.append(msg)
+    def log_to_console(self, msg, *args, category='ui', level=logging.INFO):
+        """Log to the debug console. msg is %-formatted with args only once the level and
+        category are known to be enabled, so disabled calls cost a comparison and a lookup.
+        Calls from worker threads are queued and written out on the Tk thread."""
+        if not self.log_enabled(category, level):
+            return
+        if threading.current_thread() is not self.main_thread:
+            self.log_queue.put((msg, args, category, level))
+            return
+        self.write_log(msg, args, category, level)
+    
+    def log_enabled(self, category, level=logging.INFO):
+        return level >= self.log_level and self.log_categories.get(category, True)
+    
+    def write_log(self, msg, args, category, level):
+        text = msg % args if args else msg
+        if level >= logging.WARNING:
+            line = f"[{category}] {logging.getLevelName(level)}: {text}"
+        else:
+            line = f"[{category}] {text}"
+        self.console_buffer.append(line)
+        if self.console_file_logger:
+            self.console_file_logger.log(level, line)
+        if self.log_stdout:
+            print(line)
         if self.console_text:
-            self.console_text.insert(tk.END, msg + "\n")
+            self.console_pending.append(line)
+            if self.console_flush_job is None:
+                self.console_flush_job = self.root.after(CONSOLE_FLUSH_MS, self.flush_console)
+    
+    def drain_log_queue(self):
+        """Write out log records handed over by worker threads"""
+        try:
+            while True:
+                self.write_log(*self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        self.root.after(LOG_DRAIN_MS, self.drain_log_queue)
+    
+    def flush_console(self):
+        """Write queued log lines to the console widget in one insert, keeping only the last lines"""
+        self.console_flush_job = None
+        pending, self.console_pending = self.console_pending, []
+        if not pending or not self.console_text:
+            return
+        try:
+            self.console_text.insert(tk.END, "\n".join(pending[-CONSOLE_WIDGET_LINES:]) + "\n")
+            lines = int(self.console_text.index('end-1c').split('.')[0]) - 1
+            if lines > CONSOLE_WIDGET_LINES:
+                self.console_text.delete('1.0', f'{lines - CONSOLE_WIDGET_LINES + 1}.0')
             self.console_text.see(tk.END)
-        print(msg)
+        except tk.TclError:
+            self.console_text = None
+    
+    def setup_console_log_file(self):
+        """Stream every log line to a rotating file in app_data_dir when enabled in settings"""
+        if not self.console_log_file or self.console_file_logger:
+            return
+        try:
+            handler = logging.handlers.RotatingFileHandler(
+                os.path.join(self.app_data_dir, 'desktop_pet.log'), maxBytes=CONSOLE_LOG_MAX_BYTES,
+                backupCount=CONSOLE_LOG_BACKUPS, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            logger = logging.getLogger('desktop_pet')
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(handler)
+            self.console_file_logger = logger
+        except OSError as e:
+            self.log_to_console("Could not open log file: %s", e, category='storage', level=logging.ERROR)
     
     def toggle_console(self):
         if self.console_window and self.console_window.winfo_exists():
@@ -532,23 +2389,33 @@ Settings save automatically!""")
         self.console_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         sb.config(command=self.console_text.yview)
         
-        for msg in self.console_buffer:
-            self.console_text.insert(tk.END, msg + "\n")
+        self.console_pending = []
+        recent = list(self.console_buffer)[-CONSOLE_WIDGET_LINES:]
+        if recent:
+            self.console_text.insert(tk.END, "\n".join(recent) + "\n")
+            self.console_text.see(tk.END)
         
         bf = tk.Frame(self.console_window, bg='#1e1e1e')
         bf.pack(pady=(0, 15))
-        tk.Button(bf, text="Clear", command=lambda: (self.console_text.delete(1.0, tk.END), self.console_buffer.clear()),
+        tk.Button(bf, text="Clear", command=lambda: (self.console_text.delete(1.0, tk.END), self.console_buffer.clear(),
+                                                     self.console_pending.clear()),
                  bg='#424242', fg='white', font=('Segoe UI', 10), padx=20, pady=8, relief='flat').pack(side=tk.LEFT, padx=5)
-        tk.Button(bf, text="Close", command=self.console_window.destroy, bg='#4CAF50', fg='white',
+        tk.Button(bf, text="Close", command=self.toggle_console, bg='#4CAF50', fg='white',
                  font=('Segoe UI', 10, 'bold'), padx=25, pady=8, relief='flat').pack(side=tk.LEFT, padx=5)
     
     def toggle_chat(self):
         if self.chat_window and self.chat_window.winfo_exists():
             self.chat_window.destroy()
-            self.chat_window = self.chat_display = self.chat_input = None
         else:
             self.show_chat()
     
+    def on_chat_destroy(self, event):
+        """Drop the widgets and cancel unanswered questions however the window was closed"""
+        if event.widget is self.chat_window:
+            self.chat_window = self.chat_display = self.chat_input = None
+            for future in list(self.chat_inflight.values()):
+                future.cancel()
+    
     def show_chat(self):
         self.chat_window = tk.Toplevel(self.root)
         self.chat_window.title("AI Pet Assistant")
@@ -556,6 +2423,7 @@ Settings save automatically!""")
         self.chat_window.minsize(520, 700)
         self.chat_window.configure(bg='#2b2d31')
         self.chat_window.attributes('-topmost', True)
+        self.chat_window.bind('<Destroy>', self.on_chat_destroy)
         
         hdr = tk.Frame(self.chat_window, bg='#1e1f22', height=80)
         hdr.pack(fill=tk.X, side=tk.TOP)
@@ -598,20 +2466,37 @@ Settings save automatically!""")
                                    wrap=tk.WORD, yscrollcommand=sb.set, relief='flat', padx=16, pady=16,
                                    spacing1=6, spacing3=6, state=tk.DISABLED, cursor='arrow')
         self.chat_display.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        sb.config(command=self.chat_display.yview)
+        sb.config(command=self.scroll_chat)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.chat_display.bind(sequence, lambda e: self.chat_display.after_idle(self.check_chat_scroll), add='+')
         
         self.chat_display.tag_config('user', foreground='#00a8fc', font=('Segoe UI', 11, 'bold'))
         self.chat_display.tag_config('pet', foreground='#23a55a', font=('Segoe UI', 11, 'bold'))
         self.chat_display.tag_config('system', foreground='#949ba4', font=('Segoe UI', 9, 'italic'))
         self.chat_display.tag_config('searching', foreground='#faa61a', font=('Segoe UI', 9, 'italic'))
         self.chat_display.tag_config('content', foreground='#dbdee1', font=('Segoe UI', 10), spacing1=2, spacing3=2)
-        self.chat_display.tag_config('link', foreground='#00a8fc', font=('Segoe UI', 9), underline=True)
+        self.chat_display.tag_config('link', foreground='#00a8fc', underline=True)
+        self.chat_display.tag_bind('link', '<Button-1>', self.on_chat_link_click)
+        self.chat_display.tag_bind('link', '<Enter>', lambda event: self.chat_display.config(cursor='hand2'))
+        self.chat_display.tag_bind('link', '<Leave>', lambda event: self.chat_display.config(cursor='arrow'))
         self.chat_display.tag_config('divider', foreground='#4a4d52')
         
+        # Open on the last page of the saved transcript; older pages load as the user scrolls up
+        self.chat_shown.clear()
+        self.chat_recent.clear()
+        self.chat_recent.extend(self.transcript_entries(
+            self.chat_transcript.read_before(self.chat_transcript.size, CHAT_PAGE_SIZE)))
+        self.render_chat(self.chat_recent)
+        self.chat_at_tail = True
         self.add_chat_message('system', "👋 Hi! I'm your AI assistant. I can answer questions and search the web for you. What would you like to know?")
         self.chat_window.after(100, lambda: self.chat_input.focus_force())
     
     def add_chat_message(self, sender, message):
+        # Conversation turns go to the transcript even if the window has been closed
+        offset = self.chat_transcript.append(sender, message) if sender in ('user', 'pet') else None
+        entry = [None, offset, sender, message]
+        self.chat_recent.append(entry)
+        
         if not self.chat_display:
             return
         
@@ -623,35 +2508,115 @@ Settings save automatically!""")
             return
         
         try:
-            self.chat_display.config(state=tk.NORMAL)
-            
-            if sender == 'user':
-                self.chat_display.insert(tk.END, "You: ", 'user')
-                self.chat_display.insert(tk.END, message + "\n\n")
-            elif sender == 'pet':
-                self.chat_display.insert(tk.END, "🤖 Pet: ", 'pet')
-                self.format_pet_message(message)
-                self.chat_display.insert(tk.END, "\n")
-                self.chat_display.insert(tk.END, "─" * 60 + "\n\n", 'divider')
-            elif sender == 'searching':
-                self.chat_display.insert(tk.END, message + "\n", 'searching')
+            if self.chat_at_tail:
+                self.chat_display.config(state=tk.NORMAL)
+                self.render_chat_entry(entry)
+                while len(self.chat_shown) > CHAT_WIDGET_MESSAGES:
+                    first = self.chat_shown.popleft()
+                    self.chat_display.delete(first[0], self.chat_shown[0][0])
+                    self.chat_display.mark_unset(first[0])
+                self.chat_display.config(state=tk.DISABLED)
             else:
-                self.chat_display.insert(tk.END, "→ ", 'system')
-                self.chat_display.insert(tk.END, message + "\n\n", 'system')
-            
-            self.chat_display.config(state=tk.DISABLED)
+                # Scrolled back into older pages: jump to the latest messages
+                self.render_chat(self.chat_recent)
+                self.chat_at_tail = True
             self.chat_display.see(tk.END)
         except tk.TclError:
             # Window was closed during operation
             pass
     
+    @staticmethod
+    def transcript_entries(records):
+        return [[None, offset, record.get('sender', 'system'), record.get('message', '')]
+                for offset, record in records]
+    
+    def render_chat(self, entries):
+        """Replace the chat widget contents with entries ([mark, offset, sender, message])"""
+        self.chat_display.config(state=tk.NORMAL)
+        for entry in self.chat_shown:
+            self.chat_display.mark_unset(entry[0])
+        self.chat_display.delete('1.0', tk.END)
+        self.chat_shown = deque()
+        for entry in entries:
+            self.render_chat_entry(entry)
+        self.chat_display.config(state=tk.DISABLED)
+    
+    def render_chat_entry(self, entry):
+        sender, message = entry[2], entry[3]
+        self.chat_mark_seq += 1
+        entry[0] = f"chat_msg_{self.chat_mark_seq}"
+        self.chat_display.mark_set(entry[0], 'end-1c')
+        self.chat_display.mark_gravity(entry[0], tk.LEFT)
+        self.chat_shown.append(entry)
+        
+        if sender == 'user':
+            self.chat_display.insert(tk.END, "You: ", 'user')
+            self.chat_display.insert(tk.END, message + "\n\n")
+        elif sender == 'pet':
+            self.chat_display.insert(tk.END, "🤖 Pet: ", 'pet')
+            self.format_pet_message(message)
+            self.chat_display.insert(tk.END, "\n")
+            self.chat_display.insert(tk.END, "─" * 60 + "\n\n", 'divider')
+        elif sender == 'searching':
+            self.chat_display.insert(tk.END, message + "\n", 'searching')
+        else:
+            self.chat_display.insert(tk.END, "→ ", 'system')
+            self.chat_display.insert(tk.END, message + "\n\n", 'system')
+    
+    def scroll_chat(self, *args):
+        self.chat_display.yview(*args)
+        self.check_chat_scroll()
+    
+    def check_chat_scroll(self):
+        """Page transcript messages in from disk when the view reaches either end"""
+        if not self.chat_display:
+            return
+        try:
+            top, bottom = self.chat_display.yview()
+            if top <= 0:
+                self.load_older_chat()
+            elif bottom >= 1 and not self.chat_at_tail:
+                self.load_newer_chat()
+        except tk.TclError:
+            pass
+    
+    def load_older_chat(self):
+        cursor = next((e[1] for e in self.chat_shown if e[1] is not None), self.chat_transcript.size)
+        older = self.transcript_entries(self.chat_transcript.read_before(cursor, CHAT_PAGE_SIZE))
+        if not older:
+            return
+        anchor = self.chat_shown[0] if self.chat_shown else None
+        entries = older + list(self.chat_shown)
+        if len(entries) > CHAT_WIDGET_MESSAGES:
+            entries = entries[:CHAT_WIDGET_MESSAGES]
+            self.chat_at_tail = False
+        self.render_chat(entries)
+        if anchor:
+            self.chat_display.yview(anchor[0])
+    
+    def load_newer_chat(self):
+        cursor = next((e[1] for e in reversed(self.chat_shown) if e[1] is not None), None)
+        tail_start = next((e[1] for e in self.chat_recent if e[1] is not None), self.chat_transcript.size)
+        newer = []
+        if cursor is not None:
+            newer = [r for r in self.chat_transcript.read_after(cursor, CHAT_PAGE_SIZE) if r[0] < tail_start]
+        anchor = self.chat_shown[-1] if self.chat_shown else None
+        entries = list(self.chat_shown) + self.transcript_entries(newer)
+        if len(newer) < CHAT_PAGE_SIZE:
+            # Caught up with the in-memory tail
+            shown = {id(e) for e in self.chat_shown}
+            entries += [e for e in self.chat_recent
+                        if id(e) not in shown and (e[1] is None or cursor is None or e[1] > cursor)]
+            self.chat_at_tail = True
+        self.render_chat(entries[-CHAT_WIDGET_MESSAGES:])
+        if anchor and anchor in self.chat_shown:
+            self.chat_display.see(anchor[0])
+    
     def format_pet_message(self, message):
         """Format pet messages with better styling and ALL clickable links"""
-        import time
-        
         lines = message.split('\n')
         
-        for i, line in enumerate(lines):
+        for line in lines:
             line_stripped = line.strip()
             
             if not line_stripped:
@@ -663,23 +2628,8 @@ Settings save automatically!""")
                 
                 if url:
                     self.chat_display.insert(tk.END, "   🔗 Source: ", 'content')
-                    
-                    link_start = self.chat_display.index(tk.INSERT)
-                    self.chat_display.insert(tk.END, url)
-                    link_end = self.chat_display.index(tk.INSERT)
-                    
-                    tag_name = f"clickable_link_{i}_{int(time.time() * 1000000)}"
-                    
-                    self.chat_display.tag_add(tag_name, link_start, link_end)
-                    self.chat_display.tag_config(tag_name, foreground='#00a8fc', underline=True)
-                    
-                    self.chat_display.tag_bind(tag_name, '<Button-1>', 
-                        lambda event, u=url: self.open_url_from_click(u))
-                    self.chat_display.tag_bind(tag_name, '<Enter>', 
-                        lambda event: self.chat_display.config(cursor='hand2'))
-                    self.chat_display.tag_bind(tag_name, '<Leave>', 
-                        lambda event: self.chat_display.config(cursor='arrow'))
-                    
+                    # All links share the one 'link' tag; the clicked range's text is the URL
+                    self.chat_display.insert(tk.END, url, 'link')
                     self.chat_display.insert(tk.END, "\n")
                     continue
             
@@ -688,6 +2638,12 @@ Settings save automatically!""")
             else:
                 self.chat_display.insert(tk.END, line_stripped + "\n", 'content')
     
+    def on_chat_link_click(self, event):
+        """Resolve the 'link' range under the pointer to its URL"""
+        link_range = self.chat_display.tag_prevrange('link', 'current + 1c')
+        if link_range:
+            self.open_url_from_click(self.chat_display.get(*link_range))
+    
     def open_url_from_click(self, url):
         """Open URL when clicked"""
         try:
@@ -695,9 +2651,9 @@ Settings save automatically!""")
             if not url.startswith(('http://', 'https://')):
                 url = 'https://' + url
             webbrowser.open(url)
-            self.log_to_console(f"Opened URL: {url}")
+            self.log_to_console("Opened URL: %s", url, category='ui')
         except Exception as e:
-            self.log_to_console(f"Error opening URL: {e}")
+            self.log_to_console("Error opening URL: %s", e, category='ui', level=logging.ERROR)
             messagebox.showerror("Error", f"Could not open URL:\n{url}\n\nError: {e}")
 
 # ===== END OF PART 2 - COPY PART 3 NEXT =====
@@ -710,65 +2666,206 @@ Settings save automatically!""")
         
         self.add_chat_message('user', msg)
         self.chat_input.delete(0, tk.END)
-        self.chat_history.append({'user': msg})
-        
-        thread = threading.Thread(target=self.process_message, args=(msg,), daemon=True)
-        thread.start()
-    
-    def process_message(self, msg):
-        msg_lower = msg.lower()
-        
-        if msg_lower in ['joke', 'tell me a joke', 'tell a joke', 'make me laugh']:
-            response = self.generate_pet_response(msg_lower)
-        elif msg_lower in ['time', 'what time is it', 'whats the time', "what's the time", 'what time']:
-            response = self.generate_pet_response(msg_lower)
-        elif msg_lower in ['date', 'what date is it', 'whats the date', "what's the date", 'what is the date', 'todays date', "today's date", 'what date', 'what is todays date', 'what is today', 'todays date']:
-            response = self.generate_pet_response(msg_lower)
-        elif msg_lower in ['help', 'what can you do', 'commands']:
-            response = self.generate_pet_response(msg_lower)
-        elif msg_lower in ['tip', 'give me a tip', 'productivity tip', 'advice']:
-            response = self.generate_pet_response(msg_lower)
-        elif msg_lower in ['fact', 'tell me a fact', 'fun fact', 'random fact']:
-            response = self.generate_pet_response(msg_lower)
-        elif any(msg_lower == greeting for greeting in ['hello', 'hi', 'hey', 'hi there', 'hey there', 'greetings']):
-            response = self.generate_pet_response(msg_lower)
-        elif msg_lower in ['thanks', 'thank you', 'thx']:
-            response = self.generate_pet_response(msg_lower)
-        elif msg_lower in ['how are you', 'how do you feel', 'how are you doing']:
-            response = self.generate_pet_response(msg_lower)
-        elif msg_lower in ['who are you', 'what are you']:
-            response = self.generate_pet_response(msg_lower)
-        elif msg_lower in ['bye', 'goodbye', 'see you', 'see ya', 'later']:
-            response = self.generate_pet_response(msg_lower)
+        self.submit_chat_message(msg)
+    
+    def submit_chat_message(self, msg):
+        """Queue msg on the async engine. A question identical to one still queued or running
+        shares its future; past CHAT_QUEUE_LIMIT waiting questions the oldest are dropped."""
+        key = QueryCache.normalize(msg) or msg
+        future = self.chat_inflight.get(key)
+        if future is None or future.done():
+            started = threading.Event()
+            future = self.engine.submit(self.run_chat_job(msg, time.monotonic(), started))
+            self.chat_inflight[key] = future
+            self.chat_waiting.append((future, started))
+        else:
+            self.log_to_console("Chat: joined in-flight question %r", msg, category='search')
+        future.add_done_callback(
+            lambda f: self.root.after(0, lambda: self.on_chat_answer(key, f, msg)))
+        
+        waiting = self.waiting_chats()
+        for stale in waiting[:max(0, len(waiting) - CHAT_QUEUE_LIMIT)]:
+            stale.cancel()
+    
+    def waiting_chats(self):
+        """Futures of queued questions that have not started yet. Tk thread only, like chat_waiting."""
+        while self.chat_waiting and (self.chat_waiting[0][0].done() or self.chat_waiting[0][1].is_set()):
+            self.chat_waiting.popleft()
+        return [f for f, started in self.chat_waiting if not (f.done() or started.is_set())]
+    
+    async def run_chat_job(self, msg, queued_at, started):
+        async with self.chat_slots:
+            started.set()
+            if self.log_enabled('search'):
+                # The queue is counted on the Tk thread, which owns chat_waiting
+                self.root.after(0, self.log_chat_started, time.monotonic() - queued_at)
+            try:
+                return await asyncio.wait_for(self.process_message(msg), CHAT_ANSWER_DEADLINE)
+            except asyncio.TimeoutError:
+                self.log_to_console("Chat: no answer within %ds for %r", CHAT_ANSWER_DEADLINE, msg,
+                                    category='search', level=logging.WARNING)
+                return "That took too long to look up. Please try again in a moment! ⏱️"
+    
+    def log_chat_started(self, queued):
+        self.log_to_console("Chat: started after %.0f ms in queue, %d still waiting",
+                            queued * 1000, len(self.waiting_chats()), category='search')
+    
+    def on_chat_answer(self, key, future, msg):
+        if self.chat_inflight.get(key) is future:
+            del self.chat_inflight[key]
+        if future.cancelled():
+            if self.chat_display:
+                self.add_chat_message('system', f"Skipped \"{msg}\" - newer questions were queued after it")
+            return
+        try:
+            self.add_chat_message('pet', future.result())
+        except Exception as e:
+            self.log_to_console("Chat error: %s", e, category='search', level=logging.ERROR)
+    
+    async def process_message(self, msg):
+        intent = self.intent_router.match_phrase(msg)
+        
+        if intent:
+            response = self.intent_router.respond(intent)
         else:
             try:
                 self.root.after(0, lambda: self.add_chat_message('searching', "🔍 Searching the web..."))
             except:
                 pass
-            response = self.web_search_answer(msg)
+            response = await self.web_search_answer(msg)
         
-        try:
-            self.root.after(0, lambda r=response: self.add_chat_message('pet', r))
-        except:
-            pass
+        return response
     
-    def web_search_answer(self, query):
+    async def web_search_answer(self, query):
         """Search the web and provide intelligent interpretation"""
         try:
-            result = self.search_google(query)
+            result, tier = self.search_cache.get(query)
+            if self.log_enabled('search'):
+                # stats() formats a snapshot, so only build it when the line is kept
+                if result:
+                    self.log_to_console("Search cache hit (%s): %s", tier, self.search_cache.stats(), category='search')
+                else:
+                    self.log_to_console("Search cache miss: %s", self.search_cache.stats(), category='search')
             if result:
                 return self.interpret_search_result(query, result)
             
-            result = self.search_duckduckgo(query)
+            indexed = await self.lookup_answer(query, QueryCache.ttl_for(QueryCache.normalize(query)))
+            if indexed:
+                self.search_cache.put(query, indexed)
+                return self.interpret_search_result(query, indexed)
+            
+            result = await self.hedged_search(query)
             if result:
+                self.search_cache.put(query, result)
+                await self.index_answer(query, result)
                 return self.interpret_search_result(query, result)
             
+            # Nothing live (offline, or every provider failed): an older close answer beats none
+            indexed = await self.lookup_answer(query)
+            if indexed:
+                return self.interpret_search_result(query, indexed)
+            
             return "I couldn't find specific information on that. Try rephrasing your question!"
             
         except Exception as e:
-            self.log_to_console(f"Search error: {e}")
+            self.log_to_console("Search error: %s", e, category='search', level=logging.ERROR)
             return "I'm having trouble searching right now. Please check your internet connection and try again!"
     
+    async def index_answer(self, query, result):
+        if not self.answer_index:
+            return
+        try:
+            await self.engine.run_blocking(self.answer_index.add, query, result)
+        except sqlite3.Error as e:
+            self.log_to_console("Answer index error: %s", e, category='storage', level=logging.WARNING)
+    
+    async def lookup_answer(self, query, max_age=None):
+        """Answer text from the local index for a close enough past question, or None"""
+        if not self.answer_index:
+            return None
+        try:
+            found = await self.engine.run_blocking(self.answer_index.lookup, query, max_age)
+        except sqlite3.Error as e:
+            self.log_to_console("Answer index error: %s", e, category='storage', level=logging.WARNING)
+            return None
+        if found:
+            answer, similarity, age = found
+            self.log_to_console("Answered from local index (%.0f%% match, %.0f min old)", similarity * 100, age / 60,
+                                category='search')
+            return answer
+        return None
+    
+    def setup_search_providers(self):
+        """Build the provider registry. search_providers settings override each provider's
+        timeout, weight or slow_after, or drop it with enabled: false; a fixture file adds the
+        offline replay provider, alone when search_fixture_only is set."""
+        self.search_providers = ProviderRegistry()
+        providers = []
+        if not self.search_fixture_only:
+            providers += [(GoogleProvider, {'http': self.http, 'weight': 2.0}),
+                          (DuckDuckGoProvider, {'http': self.http, 'weight': 1.0})]
+        if self.search_fixture_file:
+            providers.append((FixtureProvider, {'path': self.search_fixture_file, 'weight': 0.5,
+                                                'latency_ms': self.search_fixture_latency_ms,
+                                                'record': self.search_fixture_record}))
+        for cls, kwargs in providers:
+            options = dict(self.search_provider_settings.get(cls.name, {}))
+            if options.pop('enabled', True):
+                kwargs.update((k, v) for k, v in options.items() if k in ('timeout', 'weight', 'slow_after'))
+                self.search_providers.register(cls(**kwargs))
+    
+    async def hedged_search(self, query):
+        """Query the healthy providers concurrently, best weight first, and return the first
+        useful result. Each backup starts at once, or after search_hedge_ms without an answer."""
+        pending = set()
+        try:
+            for provider in self.search_providers.available():
+                pending.add(self.engine.run_blocking(self.timed_search, provider, query))
+                done, pending = await asyncio.wait(pending, timeout=self.search_hedge_ms / 1000,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                result = next((f.result() for f in done if f.result()), None)
+                if result:
+                    return result
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                result = next((f.result() for f in done if f.result()), None)
+                if result:
+                    return result
+            return None
+        finally:
+            # The loser's request is already on the wire; it finishes within its timeout and is ignored
+            for future in pending:
+                future.cancel()
+            if self.log_enabled('search'):
+                self.log_to_console("Search latency: %s", self.format_search_latency(), category='search')
+    
+    def timed_search(self, provider, query):
+        started = time.monotonic()
+        result = None
+        try:
+            result = provider.search(query)
+            return result
+        except Exception as e:
+            self.log_to_console("%s search error: %s", provider.name, e, category='search', level=logging.WARNING)
+            return None
+        finally:
+            elapsed = time.monotonic() - started
+            with self.search_latency_lock:
+                counts = self.search_latency.setdefault(provider.name, [0] * (len(SEARCH_LATENCY_BUCKETS_MS) + 1))
+                counts[bisect.bisect_left(SEARCH_LATENCY_BUCKETS_MS, elapsed * 1000)] += 1
+            if self.search_providers.report(provider, bool(result), elapsed):
+                self.log_to_console("%s failing or slow; skipping it for %ds", provider.name, PROVIDER_COOLDOWN,
+                                    category='search', level=logging.WARNING)
+            fixture = self.search_providers.get('fixture')
+            if result and fixture and provider is not fixture:
+                fixture.record(query, result)
+    
+    def format_search_latency(self):
+        labels = [f"<={ms}ms" for ms in SEARCH_LATENCY_BUCKETS_MS] + [f">{SEARCH_LATENCY_BUCKETS_MS[-1]}ms"]
+        with self.search_latency_lock:
+            return '; '.join(f"{name} " + ' '.join(f"{label}:{n}" for label, n in zip(labels, counts))
+                             for name, counts in self.search_latency.items())
+    
     def interpret_search_result(self, query, raw_result):
         """Interpret search results to give direct, conversational answers"""
         query_lower = query.lower()
@@ -787,271 +2884,38 @@ Settings save automatically!""")
         
         if any(word in query_lower for word in ['who is', 'who are', 'who was', 'who were', 'main cast', 'cast members', 'actors', 'starring', 'names of', 'name of']):
             if 'cast' in query_lower or 'actor' in query_lower or 'starring' in query_lower or 'names' in query_lower:
-                response = f"🎬 {self.summarize_content(content, 400)}"
+                prefix, max_chars = "🎬 ", 400
             else:
-                response = f"👤 {self.summarize_content(content, 300)}"
+                prefix, max_chars = "👤 ", 300
         elif any(word in query_lower for word in ['what is', 'what are', 'what was', 'what does']):
-            response = f"💡 {self.summarize_content(content, 300)}"
+            prefix, max_chars = "💡 ", 300
         elif query_lower.startswith('how to') or query_lower.startswith('how do'):
-            response = f"📝 {self.summarize_content(content, 350)}"
+            prefix, max_chars = "📝 ", 350
         elif any(word in query_lower for word in ['when is', 'when was', 'when did', 'when does']):
-            response = f"📅 {self.summarize_content(content, 250)}"
+            prefix, max_chars = "📅 ", 250
         elif any(word in query_lower for word in ['where is', 'where are', 'where can']):
-            response = f"📍 {self.summarize_content(content, 250)}"
+            prefix, max_chars = "📍 ", 250
         elif query_lower.startswith('why'):
-            response = f"🤔 {self.summarize_content(content, 300)}"
+            prefix, max_chars = "🤔 ", 300
         elif 'requirement' in query_lower or 'need' in query_lower:
-            response = f"✅ {self.summarize_content(content, 350)}"
+            prefix, max_chars = "✅ ", 350
         elif 'weather' in query_lower:
-            response = f"🌤️ {self.summarize_content(content, 200)}"
+            prefix, max_chars = "🌤️ ", 200
         elif 'news' in query_lower or 'latest' in query_lower:
-            response = f"📰 {self.summarize_content(content, 300)}"
+            prefix, max_chars = "📰 ", 300
         else:
-            response = self.summarize_content(content, 250)
+            prefix, max_chars = "", 250
+        
+        response = prefix + self.summarize_content(content, max_chars, query if self.summary_relevance else None)
         
         if source_lines:
             response += "\n\n" + "\n".join(source_lines)
         
         return response
     
-    def summarize_content(self, content, max_chars=250):
+    def summarize_content(self, content, max_chars=250, query=None):
         """Intelligently summarize content to specified length"""
-        content = ' '.join(content.split())
-        
-        if len(content) <= max_chars:
-            return content
-        
-        sentences = content.split('. ')
-        summary = ""
-        
-        for sentence in sentences:
-            test_length = len(summary) + len(sentence) + 2
-            if test_length <= max_chars:
-                summary += sentence + ". "
-            else:
-                break
-        
-        if summary and len(summary) > 50:
-            return summary.strip()
-        
-        truncated = content[:max_chars]
-        last_space = truncated.rfind(' ')
-        if last_space > 0:
-            return truncated[:last_space] + "..."
-        
-        return truncated + "..."
-    
-    def clean_html_text(self, text):
-        """Clean HTML entities and tags from text"""
-        text = re.sub(r'<[^>]+>', '', text)
-        text = text.replace('&quot;', '"')
-        text = text.replace('&#x27;', "'")
-        text = text.replace('&amp;', '&')
-        text = text.replace('&lt;', '<')
-        text = text.replace('&gt;', '>')
-        text = text.replace('&#39;', "'")
-        text = text.replace('&nbsp;', ' ')
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
-    
-    def search_google(self, query):
-        """Search using Google - EXE COMPATIBLE"""
-        try:
-            clean_query = urllib.parse.quote_plus(query)
-            search_url = f"https://www.google.com/search?q={clean_query}"
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            }
-            
-            # CRITICAL FIX FOR EXE: Always use verify=False
-            response = requests.get(search_url, headers=headers, timeout=10, verify=False)
-            html = response.text
-            
-            snippet_patterns = [
-                r'<div class="[^"]*VwiC3b[^"]*"[^>]*>(.*?)</div>',
-                r'<span class="[^"]*aCOpRe[^"]*"[^>]*>(.*?)</span>',
-                r'<div[^>]*data-attrid="[^"]*"[^>]*>(.*?)</div>',
-            ]
-            
-            all_snippets = []
-            for pattern in snippet_patterns:
-                all_snippets.extend(re.findall(pattern, html, re.DOTALL))
-            
-            url_pattern = r'<a href="/url\?q=(https?://[^&]+)'
-            found_urls = re.findall(url_pattern, html)
-            
-            best_result = None
-            best_length = 0
-            
-            for snippet in all_snippets[:15]:
-                clean_text = self.clean_html_text(snippet)
-                if clean_text and len(clean_text) > best_length and len(clean_text) > 50:
-                    best_result = clean_text
-                    best_length = len(clean_text)
-            
-            if best_result:
-                result_parts = [best_result]
-                
-                seen_domains = set()
-                added_urls = 0
-                
-                for url in found_urls:
-                    if added_urls >= 3:
-                        break
-                    
-                    clean_url = urllib.parse.unquote(url)
-                    
-                    domain_match = re.search(r'https?://([^/]+)', clean_url)
-                    if domain_match:
-                        domain = domain_match.group(1)
-                        if domain not in seen_domains:
-                            seen_domains.add(domain)
-                            result_parts.append(f"🔗 Source: {clean_url}")
-                            added_urls += 1
-                
-                return "\n".join(result_parts)
-            
-            return None
-            
-        except Exception as e:
-            self.log_to_console(f"Google search error: {e}")
-            return None
-    
-    def search_duckduckgo(self, query):
-        """Search using DuckDuckGo - EXE COMPATIBLE"""
-        try:
-            clean_query = urllib.parse.quote_plus(query)
-            search_url = f"https://html.duckduckgo.com/html/?q={clean_query}"
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            # CRITICAL FIX FOR EXE: Always use verify=False
-            response = requests.get(search_url, headers=headers, timeout=10, verify=False)
-            html = response.text
-            
-            snippet_patterns = [
-                r'class="result__snippet"[^>]*>(.*?)</a>',
-                r'class="result__body"[^>]*>(.*?)</div>',
-            ]
-            
-            all_snippets = []
-            for pattern in snippet_patterns:
-                all_snippets.extend(re.findall(pattern, html, re.DOTALL))
-            
-            url_matches = re.findall(r'class="result__url"[^>]*>(.*?)</a>', html, re.DOTALL)
-            
-            best_result = None
-            best_length = 0
-            
-            for snippet in all_snippets[:10]:
-                clean_text = self.clean_html_text(snippet)
-                if clean_text and len(clean_text) > best_length and len(clean_text) > 50:
-                    best_result = clean_text
-                    best_length = len(clean_text)
-            
-            if best_result:
-                result_parts = [best_result]
-                
-                for i, url_html in enumerate(url_matches[:3]):
-                    clean_url = self.clean_html_text(url_html)
-                    if clean_url:
-                        if not clean_url.startswith(('http://', 'https://')):
-                            clean_url = 'https://' + clean_url
-                        result_parts.append(f"🔗 Source: {clean_url}")
-                
-                return "\n".join(result_parts)
-            
-            return None
-            
-        except Exception as e:
-            self.log_to_console(f"DuckDuckGo search error: {e}")
-            return None
-    
-    def generate_pet_response(self, message):
-        """Generate response for built-in commands"""
-        
-        if 'help' in message or 'what can you do' in message:
-            return ("I can help you with:\n"
-                   "• Search the web for ANY question\n"
-                   "• Tell you the time/date\n"
-                   "• Tell jokes and fun facts\n"
-                   "• Give productivity tips\n"
-                   "• Answer questions\n"
-                   "• Just chat!\n\n"
-                   "Just ask me anything naturally!")
-        
-        if 'time' in message or 'what time' in message:
-            current_time = datetime.datetime.now().strftime("%I:%M %p")
-            return f"It's currently {current_time}! ⏰"
-        
-        if 'date' in message or 'what day' in message or ('today' in message and 'news' not in message):
-            current_date = datetime.datetime.now().strftime("%A, %B %d, %Y")
-            return f"Today is {current_date}! 📅"
-        
-        if 'joke' in message or 'funny' in message or 'make me laugh' in message:
-            jokes = [
-                "Why do programmers prefer dark mode? Because light attracts bugs! 🐛",
-                "Why did the desktop pet cross the road? To get to the other taskbar! 🐾",
-                "What's a computer's favorite snack? Microchips! 💾",
-                "Why was the computer cold? It left its Windows open! 🪟",
-                "How do you comfort a JavaScript bug? You console it! 😄",
-                "Why do Java developers wear glasses? Because they can't C#! 👓",
-                "What did the router say to the doctor? It hurts when IP! 🤕"
-            ]
-            return random.choice(jokes)
-        
-        if 'tip' in message or 'productivity' in message or 'advice' in message:
-            tips = [
-                "Take regular breaks! Try the Pomodoro technique: 25 minutes of work, 5 minutes of rest. 🍅",
-                "Stay hydrated! Your brain works better when you drink enough water. 💧",
-                "Organize your tasks by priority. Do the most important things first! 📝",
-                "A clean workspace leads to a clear mind. Take a minute to tidy up! 🧹",
-                "Don't forget to stretch! Your body will thank you. 🧘",
-                "Use keyboard shortcuts to save time and boost productivity! ⌨️",
-                "Set specific goals for the day. Checking them off feels great! ✅"
-            ]
-            return random.choice(tips)
-        
-        if 'fact' in message or 'tell me something' in message:
-            facts = [
-                "The first computer mouse was made of wood! 🖱️",
-                "The average person blinks 15-20 times per minute, but only 7 times while using a computer! 👀",
-                "The QWERTY keyboard was designed to slow down typing to prevent typewriter jams! ⌨️",
-                "Email existed before the World Wide Web! 📧",
-                "The first 1GB hard drive weighed over 500 pounds! 💾",
-                "There are more possible games of chess than atoms in the observable universe! ♟️",
-                "The first computer bug was an actual bug - a moth trapped in a computer! 🦋"
-            ]
-            return random.choice(facts)
-        
-        if 'thank' in message:
-            return "You're very welcome! Happy to help! 😊"
-        
-        if 'how are you' in message or 'how do you feel' in message:
-            return "I'm doing great! Thanks for asking. Ready to assist you anytime! 🐾"
-        
-        if 'who are you' in message or 'what are you' in message:
-            return "I'm your Desktop Pet AI Assistant! I'm here to keep you company, help you stay productive, and answer your questions. I can search the web for you! 🤖"
-        
-        if 'bye' in message or 'goodbye' in message:
-            return "Goodbye! I'll be here whenever you need me. Take care! 👋"
-        
-        if 'love' in message or '❤' in message or 'like you' in message:
-            return "Aww, I appreciate you too! You're awesome! ❤️"
-        
-        if any(word in message for word in ['hello', 'hi', 'hey', 'greetings']):
-            greetings = [
-                "Hello! How can I help you today? 😊",
-                "Hey there! What's up? 🐾",
-                "Hi! Nice to see you! What can I do for you? 👋",
-                "Greetings! Ready to assist! ✨"
-            ]
-            return random.choice(greetings)
-        
-        return "I'm here to help! Ask me anything and I'll search the web for answers. 🔍"
+        return self.summarizer.summarize(content, max_chars, query)
     
     def add_to_startup(self):
         """Add to startup"""
@@ -1073,11 +2937,11 @@ Settings save automatically!""")
             winreg.CloseKey(key)
             
             messagebox.showinfo("Success", "Desktop Pet added to startup!\n\nIt will start automatically on login.")
-            self.log_to_console("Added to Windows startup")
+            self.log_to_console("Added to Windows startup", category='ui')
             
         except Exception as e:
             messagebox.showerror("Error", f"Could not add to startup:\n\n{e}")
-            self.log_to_console(f"Startup error: {e}")
+            self.log_to_console("Startup error: %s", e, category='ui', level=logging.ERROR)
 
 if __name__ == "__main__":
     print("=" * 50)
@@ -1090,8 +2954,8 @@ if __name__ == "__main__":
     pet = DesktopPet()
     
     pet.log_to_console("Desktop Pet started successfully")
-    pet.log_to_console(f"Settings directory: {pet.app_data_dir}")
-    pet.log_to_console(f"Loaded {len(pet.custom_shortcuts)} shortcuts")
-    pet.log_to_console(f"Loaded {len(pet.custom_urls)} URLs")
+    pet.log_to_console("Settings directory: %s", pet.app_data_dir)
+    pet.log_to_console("Loaded %d shortcuts", len(pet.custom_shortcuts), category='storage')
+    pet.log_to_console("Loaded %d URLs", len(pet.custom_urls), category='storage')
 
 # ===== END OF PART 3 - SCRIPT COMPLETE! =====
@@ -0,0 +1,29 @@
+import pytest
+
+from desktop_pet import AnswerIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = AnswerIndex(str(tmp_path / 'answers.db'))
+    yield index
+    index.close()
+
+
+def test_rephrased_question_matches(index):
+    index.add("What is the capital of France?", "Paris")
+    answer, similarity, age = index.lookup("what is the capital of france", 60)
+    assert answer == "Paris"
+    assert similarity == 1.0
+
+
+def test_tense_keeps_questions_apart(index):
+    index.add("who was the president of France", "Charles de Gaulle")
+    assert index.lookup("who is the president of France", 3600) is None
+    assert index.lookup("who is the president of France") is None
+
+
+def test_stale_answer_needs_no_max_age(index):
+    index.add("how tall is mount everest", "8,849 m")
+    assert index.lookup("how tall is mount everest", -1) is None
+    assert index.lookup("how tall is mount everest")[0] == "8,849 m"
@@ -0,0 +1,68 @@
+import mmap
+import types
+
+from PIL import Image
+
+from desktop_pet import DesktopPet
+
+
+def make_pet(tmp_path):
+    """The frame cache methods of DesktopPet on a bare object, without Tk"""
+    messages = []
+    pet = types.SimpleNamespace(frames=None, frame_window=32, frame_prefetch=4, frame_memory_budget_mb=64,
+                                log_to_console=lambda msg, *args, **kwargs: messages.append(msg % args),
+                                get_frame_cache_dir=lambda: str(tmp_path), prune_frame_cache=lambda: None)
+    for name in ('store_cached_frames', 'load_cached_frames', 'make_frame_provider', 'replace_frames'):
+        setattr(pet, name, types.MethodType(getattr(DesktopPet, name), pet))
+    return pet, messages
+
+
+def cache_map(close):
+    return next(cell.cell_contents for cell in close.__closure__ if isinstance(cell.cell_contents, mmap.mmap))
+
+
+def test_replacing_frames_unmaps_the_cache(tmp_path):
+    pet, messages = make_pet(tmp_path)
+    frames = [Image.new('RGBA', (8, 8), (i * 60, 0, 0, 255)) for i in range(3)]
+    assert pet.store_cached_frames('key', frames, (8, 8), [50, 60, 70])
+    
+    count, size, loader, durations, keyframe, close = cached = pet.load_cached_frames('key')
+    assert (count, size, durations) == (3, (8, 8), [50, 60, 70])
+    pet.replace_frames(pet.make_frame_provider(loader, count, size, durations, keyframe, close))
+    data = cache_map(close)
+    # Frames read from the map are used and dropped, as FrameProvider does when it builds PhotoImages
+    assert keyframe().getpixel((0, 0)) == (0, 0, 0, 255)
+    for index in range(count):
+        loader(index)
+    del cached, loader, keyframe
+    
+    pet.replace_frames(pet.make_frame_provider(lambda i: (frames[0], (0, 0)), 1, (8, 8)))
+    assert data.closed
+    assert not any('still in use' in message for message in messages)
+
+
+def test_unmap_failure_is_logged(tmp_path):
+    pet, messages = make_pet(tmp_path)
+    frames = [Image.new('RGBA', (8, 8), (i * 60, 0, 0, 255)) for i in range(2)]
+    pet.store_cached_frames('key', frames, (8, 8))
+    count, size, loader, durations, keyframe, close = pet.load_cached_frames('key')
+    pet.replace_frames(pet.make_frame_provider(loader, count, size, durations, keyframe, close))
+    frame = keyframe()  # still alive, so its buffer is still exported from the map
+    
+    pet.replace_frames(pet.make_frame_provider(lambda i: (frames[0], (0, 0)), 1, (8, 8)))
+    assert not cache_map(close).closed
+    assert any('still in use' in message for message in messages)
+    del frame
+
+
+def test_decoder_keeps_gif_frame_timings(tmp_path):
+    path = tmp_path / 'pet.gif'
+    frames = [Image.new('RGBA', (8, 8), (i * 60, 0, 0, 255)) for i in range(3)]
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=[40, 250, 90], loop=0)
+    pet, messages = make_pet(tmp_path)
+    with Image.open(path) as img:
+        count, size, loader, durations, keyframe, close = DesktopPet.make_frame_decoder(pet, img, (4, 4))
+        assert (count, size, durations) == (3, (4, 4), [40, 250, 90])
+        image, position = loader(2)
+        assert image.size == (4, 4) and position == (0, 0)
+        assert close == img.close
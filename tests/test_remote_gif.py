@@ -0,0 +1,134 @@
+import http.server
+import io
+import os
+import queue
+import threading
+import time
+import types
+
+import pytest
+from PIL import Image
+
+from desktop_pet import DesktopPet, HttpClient
+
+
+def make_gif(colors):
+    frames = [Image.new('RGBA', (16, 16), color) for color in colors]
+    data = io.BytesIO()
+    frames[0].save(data, 'GIF', save_all=True, append_images=frames[1:], duration=100, loop=0)
+    return data.getvalue()
+
+
+class GifServer:
+    """Serves one GIF with an ETag from localhost, answering If-None-Match with 304"""
+    
+    def __init__(self, body, etag):
+        self.body = body
+        self.etag = etag
+        self.requests = []
+        server = self
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                if self.headers.get('If-None-Match') == server.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/gif')
+                self.send_header('Content-Length', str(len(server.body)))
+                self.send_header('ETag', server.etag)
+                self.end_headers()
+                self.wfile.write(server.body)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}/pet.gif'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FakeRoot:
+    """Collects root.after callbacks from any thread; pump() runs them as the Tk loop would"""
+    
+    def __init__(self):
+        self.calls = queue.Queue()
+    
+    def after(self, ms, func, *args):
+        self.calls.put((func, args))
+    
+    def geometry(self, spec):
+        pass
+    
+    def pump(self, until, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not until():
+            func, args = self.calls.get(timeout=max(0.01, deadline - time.monotonic()))
+            func(*args)
+
+
+class BarePet:
+    """DesktopPet's methods on an object with no Tk window; the state they need is passed in"""
+    
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+    
+    def __getattr__(self, name):
+        return types.MethodType(getattr(DesktopPet, name), self)
+
+
+@pytest.fixture
+def server():
+    server = GifServer(make_gif([(255, 0, 0, 255), (0, 255, 0, 255)]), '"v1"')
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def pet(tmp_path, server):
+    http_client = HttpClient()
+    pet = BarePet(app_data_dir=str(tmp_path), http=http_client, root=FakeRoot(), pet_gif_url=server.url,
+                  custom_image_path=None, remote_gif_checked=set(), frames=None, frame_load_generation=0,
+                  frame_window=32, frame_prefetch=4, frame_memory_budget_mb=64, load_progress_label=None,
+                  show_load_progress=lambda *args: None, log_to_console=lambda *args, **kwargs: None)
+    yield pet
+    http_client.close()
+
+
+def test_fetch_revalidates_with_etag(pet, server):
+    path = pet.get_remote_gif_path(server.url)
+    
+    assert pet.fetch_remote_gif(server.url)
+    with open(path, 'rb') as f:
+        assert f.read() == server.body
+    assert 'If-None-Match' not in server.requests[-1]
+    
+    mtime = os.stat(path).st_mtime_ns
+    assert not pet.fetch_remote_gif(server.url)
+    assert server.requests[-1]['If-None-Match'] == '"v1"'
+    assert os.stat(path).st_mtime_ns == mtime
+    
+    server.body, server.etag = make_gif([(0, 0, 255, 255)] * 3), '"v2"'
+    assert pet.fetch_remote_gif(server.url)
+    with open(path, 'rb') as f:
+        assert f.read() == server.body
+    assert not pet.fetch_remote_gif(server.url)
+
+
+def test_placeholder_is_swapped_for_downloaded_gif(pet, server):
+    pet.load_gif()
+    assert (pet.frames.count, pet.frames.size) == (1, (80, 80))  # placeholder while downloading
+    
+    pet.root.pump(until=lambda: pet.frames.count == 2)
+    assert pet.frames.durations == [100, 100]
+    assert len(server.requests) == 1
+    
+    pet.load_gif()  # already revalidated this session: shown from disk, no new request
+    assert pet.frames.count == 2
+    assert len(server.requests) == 1
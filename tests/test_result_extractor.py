@@ -0,0 +1,35 @@
+import re
+
+from desktop_pet import DUCKDUCKGO_RESULT_PATTERNS, GOOGLE_RESULT_PATTERNS, ResultExtractor
+
+
+def findall_per_pattern(patterns, max_snippets, max_links, page):
+    """The scrape ResultExtractor replaced: one findall per pattern, then the caps"""
+    found = {'snippet': [], 'link': []}
+    for kind, pattern in patterns:
+        found[kind].extend(re.findall(pattern, page, re.DOTALL))
+    snippets = [ResultExtractor.clean(text) for text in found['snippet'][:max_snippets]]
+    links = [ResultExtractor.clean(text) for text in found['link'][:max_links]]
+    return [text for text in snippets if text], [text for text in links if text]
+
+
+def test_patterns_matching_at_one_position_are_all_collected():
+    page = ('<div class="a VwiC3b b" data-attrid="x">First body</div>'
+            '<div class="VwiC3b">second</div><div data-attrid="y">third</div>')
+    snippets, links = ResultExtractor(GOOGLE_RESULT_PATTERNS, 15, None).extract(page)
+    assert snippets == ['First body', 'second', 'First body', 'third']
+    assert (snippets, links) == findall_per_pattern(GOOGLE_RESULT_PATTERNS, 15, None, page)
+
+
+def test_caps_count_matches_that_clean_to_nothing():
+    page = ('<div class="VwiC3b"><b></b></div>' * 3 + '<div class="VwiC3b">kept</div>'
+            '<a href="/url?q=https://a.example/&sa=U">')
+    assert ResultExtractor(GOOGLE_RESULT_PATTERNS, 3, None).extract(page) == ([], ['https://a.example/'])
+    assert ResultExtractor(GOOGLE_RESULT_PATTERNS, 4, None).extract(page) == (['kept'], ['https://a.example/'])
+
+
+def test_nested_results_match_findall():
+    page = ''.join(f'<div class="result__body"><a class="result__url" href="#">site{i}.example</a>'
+                   f'<a class="result__snippet" href="#">Result {i} &amp; more</a></div>' for i in range(5))
+    extractor = ResultExtractor(DUCKDUCKGO_RESULT_PATTERNS, 10, 3)
+    assert extractor.extract(page) == findall_per_pattern(DUCKDUCKGO_RESULT_PATTERNS, 10, 3, page)
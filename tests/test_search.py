@@ -0,0 +1,128 @@
+import http.server
+import threading
+import time
+import types
+
+import pytest
+
+from desktop_pet import (PROVIDER_FAILURE_LIMIT, AsyncEngine, DesktopPet, DuckDuckGoProvider, HttpClient,
+                         ProviderRegistry, SearchProvider)
+
+
+class StubProvider(SearchProvider):
+    def __init__(self, name, result, delay=0.0, weight=1.0):
+        super().__init__(timeout=5, weight=weight)
+        self.name = name
+        self.result = result
+        self.delay = delay
+        self.started = None
+    
+    def search(self, query):
+        self.started = time.monotonic()
+        time.sleep(self.delay)
+        return self.result
+
+
+@pytest.fixture
+def engine():
+    engine = AsyncEngine(workers=4)
+    yield engine
+    engine.close()
+
+
+def hedged_search(engine, providers, hedge_ms):
+    """Run DesktopPet.hedged_search against providers on a bare object, without Tk"""
+    registry = ProviderRegistry()
+    for provider in providers:
+        registry.register(provider)
+    pet = types.SimpleNamespace(search_providers=registry, engine=engine, search_hedge_ms=hedge_ms,
+                                search_latency={}, search_latency_lock=threading.Lock(),
+                                log_enabled=lambda *args: True, log_to_console=lambda *args, **kwargs: None)
+    for name in ('hedged_search', 'timed_search', 'format_search_latency'):
+        setattr(pet, name, types.MethodType(getattr(DesktopPet, name), pet))
+    started = time.monotonic()
+    result = engine.submit(pet.hedged_search('query')).result(timeout=5)
+    return result, time.monotonic() - started
+
+
+def test_first_result_wins(engine):
+    slow = StubProvider('slow', 'slow answer', delay=1.0, weight=2)
+    fast = StubProvider('fast', 'fast answer', delay=0.05)
+    result, elapsed = hedged_search(engine, [slow, fast], hedge_ms=0)
+    assert result == 'fast answer'
+    assert elapsed < 0.5
+
+
+def test_empty_result_falls_through_to_backup(engine):
+    broken = StubProvider('broken', None, weight=2)
+    backup = StubProvider('backup', 'backup answer', delay=0.05)
+    assert hedged_search(engine, [broken, backup], hedge_ms=0)[0] == 'backup answer'
+
+
+def test_backup_waits_for_hedge_delay(engine):
+    primary = StubProvider('primary', 'primary answer', delay=0.05, weight=2)
+    backup = StubProvider('backup', 'backup answer')
+    assert hedged_search(engine, [primary, backup], hedge_ms=300)[0] == 'primary answer'
+    assert backup.started is None
+    
+    primary = StubProvider('primary', 'primary answer', delay=1.0, weight=2)
+    backup = StubProvider('backup', 'backup answer')
+    result, elapsed = hedged_search(engine, [primary, backup], hedge_ms=150)
+    assert result == 'backup answer'
+    assert backup.started - primary.started >= 0.14
+    assert elapsed < 0.8
+
+
+def test_failures_put_provider_on_cooldown():
+    registry = ProviderRegistry()
+    flaky = StubProvider('flaky', None, weight=2)
+    steady = StubProvider('steady', 'answer')
+    registry.register(flaky)
+    registry.register(steady)
+    assert registry.available() == [flaky, steady]
+    
+    for _ in range(PROVIDER_FAILURE_LIMIT - 1):
+        assert not registry.report(flaky, False, 0.1)
+    assert registry.report(flaky, True, 0.1) is False  # a good answer resets the count
+    for _ in range(PROVIDER_FAILURE_LIMIT - 1):
+        assert not registry.report(flaky, False, 0.1)
+    assert registry.report(flaky, True, flaky.slow_after + 1)  # slow answers count as failures
+    assert registry.available() == [steady]
+    
+    for _ in range(PROVIDER_FAILURE_LIMIT):
+        registry.report(steady, False, 0.1)
+    assert registry.available() == [flaky, steady]  # every provider cooling down: try them all
+
+
+def test_hedged_search_over_local_http(engine):
+    page = ('<div class="result__body"><div class="result__title"><a href="#">Local result</a></div>'
+            '<a class="result__url" href="#">local.example/answer</a>'
+            '<a class="result__snippet" href="#">A local stand-in answer that is long enough to be picked.</a></div>')
+    
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = page.encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    http_client = HttpClient()
+    try:
+        local = DuckDuckGoProvider(http_client, weight=2)
+        local.url = f'http://127.0.0.1:{server.server_address[1]}/html/'
+        stalled = StubProvider('stalled', 'too late', delay=1.0)
+        result, elapsed = hedged_search(engine, [local, stalled], hedge_ms=0)
+    finally:
+        http_client.close()
+        server.shutdown()
+        server.server_close()
+    assert result == ('A local stand-in answer that is long enough to be picked.\n'
+                      '🔗 Source: https://local.example/answer')
+    assert elapsed < 0.8
@@ -0,0 +1,31 @@
+import json
+import os
+
+from desktop_pet import JsonStore
+
+
+def write_legacy(tmp_path, data):
+    legacy = tmp_path / 'legacy_settings.json'
+    legacy.write_text(json.dumps(data), encoding='utf-8')
+    return str(legacy)
+
+
+def test_legacy_file_migrated(tmp_path):
+    legacy = write_legacy(tmp_path, {'size': 120})
+    store = JsonStore(str(tmp_path / 'settings.json'), {}, legacy, log=lambda *args, **kwargs: None)
+    assert store.load() == {'size': 120}
+    assert JsonStore.read(str(tmp_path / 'settings.json'), {}) == {'size': 120}
+    assert not os.path.exists(legacy)
+    assert os.path.exists(legacy + '.migrated')
+
+
+def test_legacy_file_kept_when_new_store_cannot_be_written(tmp_path):
+    legacy = write_legacy(tmp_path, {'size': 120})
+    messages = []
+    store = JsonStore(str(tmp_path / 'missing' / 'settings.json'), {}, legacy,
+                      log=lambda msg, *args, **kwargs: messages.append(msg % args))
+    assert store.load() == {'size': 120}
+    assert store.dirty
+    assert os.path.exists(legacy)
+    assert not os.path.exists(legacy + '.migrated')
+    assert any(message.startswith('Keeping') for message in messages)